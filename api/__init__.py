@@ -1,3 +1,12 @@
 from .common import APIError
-from .psn import PSN, PSNOperation, PSNRequest, USERNAME_PATTERN
+from .accounts import PSNAWPClientCache
+from .cache import TTLCache
+from .credentials import CredentialStore
+from .concurrency import SingleFlight, map_bounded
+from .metrics import REGISTRY, start_metrics_server
+from .ratelimit import HostRateLimiter, TokenBucket
+from .regions import RegionRanker, product_prefix
+from .resilience import CircuitBreaker, RetryPolicy
+from .storage import AccountIdCache, CatalogEntry, ProductCatalog, SkuCacheStore, SQLiteStore
+from .psn import PSN, PSNHttpRequest, PSNHttpResponse, PSNOperation, PSNRequest, FULL_SKU_SUFFIX_RE, USERNAME_PATTERN
 from .psprices import PSPrices, DECIMAL_RE
\ No newline at end of file
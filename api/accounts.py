@@ -0,0 +1,67 @@
+import asyncio
+import hashlib
+import time
+
+from psnawp_api import PSNAWP
+
+from api.cache import TTLCache
+
+
+class PSNAWPClientCache:
+    "Authenticated PSNAWP clients keyed by a hash of their NPSSO, kept until the refresh token is about to expire."
+
+    def __init__(self, maxsize: int = 32, default_ttl: float = 60 * 60, expiry_margin: float = 5 * 60) -> None:
+        self.expiry_margin = expiry_margin
+        self._clients = TTLCache(maxsize, default_ttl)
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    def key(npsso: str) -> str:
+        return hashlib.sha256(npsso.encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    @property
+    def hits(self) -> int:
+        return self._clients.hits
+
+    @property
+    def misses(self) -> int:
+        return self._clients.misses
+
+    def cached(self, npsso: str) -> PSNAWP | None:
+        return self._clients.get(self.key(npsso))
+
+    def store(self, npsso: str, client: PSNAWP) -> None:
+        self._clients.set(self.key(npsso), client)
+
+    def lock(self, npsso: str) -> asyncio.Lock:
+        "Serializes calls on one client (its token refresh is not thread-safe) without tying up pool workers."
+        key = self.key(npsso)
+        lock = self._locks.get(key)
+        if lock is None:
+            self._prune_locks()
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    def _prune_locks(self) -> None:
+        # Clients leave the cache by TTL or LRU without telling us; drop their idle locks.
+        for key in [key for key, lock in self._locks.items() if key not in self._clients and not lock.locked()]:
+            del self._locks[key]
+
+    def renew(self, npsso: str, client: PSNAWP) -> None:
+        "Re-arm the entry so it lives as long as the client's refresh token, minus a safety margin."
+        authenticator = getattr(client, "authenticator", None)
+        if authenticator is None or authenticator.token_response is None:
+            return
+        ttl = authenticator.refresh_token_expiration_time - time.time() - self.expiry_margin
+        if ttl <= 0:
+            self.evict(npsso)
+            return
+        self._clients.set(self.key(npsso), client, ttl=ttl)
+
+    def evict(self, npsso: str) -> None:
+        key = self.key(npsso)
+        self._clients.pop(key)
+        self._locks.pop(key, None)
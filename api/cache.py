@@ -0,0 +1,94 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+
+class TTLCache:
+    "Bounded in-memory cache with per-entry expiry, an optional stale window and least-recently-used eviction."
+
+    def __init__(self, maxsize: int, ttl: float, stale_ttl: float = 0.0) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = max(0.0, stale_ttl)
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        now = time.monotonic()
+        if expires_at <= now:
+            if expires_at + self.stale_ttl <= now:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def remaining(self, key: Hashable) -> float | None:
+        "Seconds until `key` expires (negative once stale) without touching stats or recency."
+        entry = self._entries.get(key)
+        return None if entry is None else entry[0] - time.monotonic()
+
+    def lookup(self, key: Hashable, allow_stale: bool = False) -> tuple[Any, float] | None:
+        "Return (value, seconds until expiry), negative once stale; expired entries only with allow_stale and within the stale window."
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is None or entry[0] + self.stale_ttl <= now:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= now and not allow_stale:
+            # Kept for callers that may serve it stale; this caller refetches.
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        if expires_at > now:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return value, expires_at - now
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
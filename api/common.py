@@ -1,3 +1,13 @@
+import json
+from collections.abc import Iterator
+from typing import Any
+
+try:  # optional faster backend; the stdlib decoder is used when it is missing
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
 class APIError(Exception):
     "Exception raised for any type of errors in the API."
 
@@ -11,3 +21,22 @@ class APIError(Exception):
         self.message = message
         self.code = code
         self.hints = hints or {}
+
+
+def json_loads(data: bytes) -> Any:
+    "Decode a JSON body straight from bytes, using orjson when it is installed."
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def iter_json(value: Any) -> Iterator[tuple[str | None, Any]]:
+    "Walk a decoded JSON document depth-first, yielding (key, value) pairs without serializing it."
+    stack: list[tuple[str | None, Any]] = [(None, value)]
+    while stack:
+        key, current = stack.pop()
+        yield key, current
+        if isinstance(current, dict):
+            stack.extend(current.items())
+        elif isinstance(current, list):
+            stack.extend((None, item) for item in current)
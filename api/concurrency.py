@@ -0,0 +1,49 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def map_bounded(
+    func: Callable[[T], Awaitable[R]],
+    items: Iterable[T],
+    limit: int,
+) -> list[R | Exception]:
+    "Run func over items with at most `limit` in flight; results keep input order and failures are returned, not raised."
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(item: T) -> R | Exception:
+        async with semaphore:
+            try:
+                return await func(item)
+            except Exception as exc:
+                return exc
+
+    return list(await asyncio.gather(*(run(item) for item in items)))
+
+
+class SingleFlight:
+    "Coalesce concurrent calls for the same key onto one in-flight task."
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[R]]) -> R:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        # Shield so one caller being cancelled does not cancel the shared request.
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.exception()  # mark retrieved even if every waiter went away
@@ -0,0 +1,57 @@
+import os
+import time
+from pathlib import Path
+
+from dotenv import dotenv_values
+
+
+class CredentialStore:
+    "In-memory view of a .env file that is re-read only when the file is replaced or modified."
+
+    def __init__(self, env_path: str | Path | None, check_interval: float = 1.0) -> None:
+        self.env_path = Path(env_path).resolve() if env_path else None
+        self.check_interval = check_interval
+        self._values: dict[str, str] = {}
+        self._signature: tuple[int, int, int] | None = None
+        self._checked_at = 0.0
+        self.reloads = 0
+        self.reload()
+
+    def _stat_signature(self) -> tuple[int, int, int] | None:
+        if self.env_path is None:
+            return None
+        try:
+            stat = os.stat(self.env_path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def reload(self) -> bool:
+        "Re-read the file unconditionally; returns True when it exists."
+        self._checked_at = time.monotonic()
+        self._signature = self._stat_signature()
+        if self._signature is None:
+            self._values = {}
+            return False
+        values = dotenv_values(self.env_path)
+        self._values = {key: value for key, value in values.items() if value}
+        self.reloads += 1
+        return True
+
+    def _refresh_if_changed(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        signature = self._stat_signature()
+        if signature != self._signature:
+            print(f"[psn] Detected change in {self.env_path}; reloading credentials.")
+            self.reload()
+
+    def exists(self) -> bool:
+        self._refresh_if_changed()
+        return self._signature is not None
+
+    def get(self, name: str) -> str | None:
+        self._refresh_if_changed()
+        return self._values.get(name)
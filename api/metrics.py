@@ -0,0 +1,263 @@
+import re
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import aiohttp
+from aiohttp import web
+
+from api.common import APIError
+
+# Latency buckets in seconds, from cache-fast answers up to the 30s HTTP timeout.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Snowflakes and other long numeric path segments collapse to one label value.
+ID_SEGMENT_RE = re.compile(r"/\d{5,}(?=/|$)")
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric(ABC):
+    "Base for metrics exposed in the Prometheus text format."
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterator[str]:
+        "Sample lines for this metric, without the HELP/TYPE header."
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+@dataclass
+class _HistogramSeries:
+    # Non-cumulative bucket counts; the last slot is +Inf.
+    counts: list[int]
+    total: float = 0.0
+    count: int = 0
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[LabelValues, _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _HistogramSeries([0] * (len(self.buckets) + 1))
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        series.counts[index] += 1
+        series.total += value
+        series.count += 1
+
+    def samples(self) -> Iterator[str]:
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), series.counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series.total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {series.count}"
+
+
+class CallbackMetric(Metric):
+    "Values read at scrape time from named sources, e.g. the hit/miss counters a cache already keeps."
+
+    def __init__(self, name: str, help_text: str, kind: str, labelname: str, field: str) -> None:
+        super().__init__(name, help_text, (labelname,))
+        self.kind = kind
+        self.field = field
+        self._sources: dict[str, Callable[[], dict[str, float]]] = {}
+
+    def add_source(self, label: str, stats: Callable[[], dict[str, float]]) -> None:
+        self._sources[label] = stats
+
+    def samples(self) -> Iterator[str]:
+        for label, stats in sorted(self._sources.items()):
+            value = stats().get(self.field)
+            if value is not None:
+                yield f"{self.name}{_format_labels(self.labelnames, (label,))} {_format_value(value)}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+PSN_OPERATION_SECONDS = REGISTRY.register(Histogram(
+    "psn_operation_duration_seconds",
+    "Latency of PlayStation operations by outcome (ok or the APIError code).",
+    ("operation", "outcome"),
+))
+PSN_ERRORS = REGISTRY.register(Counter(
+    "psn_errors_total",
+    "PlayStation errors by operation and APIError code.",
+    ("operation", "code"),
+))
+PSN_RATE_LIMIT_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "psn_rate_limit_wait_seconds",
+    "Time PlayStation requests spent queued in the per-host rate limiter.",
+    ("host",),
+))
+DISCORD_REST_SECONDS = REGISTRY.register(Histogram(
+    "discord_rest_request_duration_seconds",
+    "Latency of Discord REST calls by method, route and status.",
+    ("method", "route", "status"),
+))
+CACHE_HITS = REGISTRY.register(CallbackMetric("psn_cache_hits_total", "Cache hits.", "counter", "cache", "hits"))
+CACHE_STALE_HITS = REGISTRY.register(
+    CallbackMetric("psn_cache_stale_hits_total", "Lookups answered by an expired entry.", "counter", "cache", "stale_hits")
+)
+CACHE_MISSES = REGISTRY.register(CallbackMetric("psn_cache_misses_total", "Cache misses.", "counter", "cache", "misses"))
+CACHE_ENTRIES = REGISTRY.register(CallbackMetric("psn_cache_entries", "Entries currently cached.", "gauge", "cache", "size"))
+
+
+def register_cache(name: str, stats: Callable[[], dict[str, float]]) -> None:
+    "Expose a cache's hits/misses/size; registering the same name again replaces the source."
+    for metric in (CACHE_HITS, CACHE_STALE_HITS, CACHE_MISSES, CACHE_ENTRIES):
+        metric.add_source(name, stats)
+
+
+def record_error(operation: str, error: APIError) -> None:
+    PSN_ERRORS.inc(operation=operation, code=error.code or "other")
+
+
+@contextmanager
+def track_operation(operation: str) -> Iterator[None]:
+    "Time a PlayStation operation and count the APIError code it fails with, if any."
+    started = time.perf_counter()
+    outcome = "cancelled"
+    try:
+        yield
+        outcome = "ok"
+    except APIError as exc:
+        outcome = exc.code or "other"
+        record_error(operation, exc)
+        raise
+    except Exception:
+        outcome = "exception"
+        PSN_ERRORS.inc(operation=operation, code=outcome)
+        raise
+    finally:
+        PSN_OPERATION_SECONDS.observe(time.perf_counter() - started, operation=operation, outcome=outcome)
+
+
+def route_label(path: str) -> str:
+    return ID_SEGMENT_RE.sub("/{id}", path)
+
+
+def discord_trace_config() -> aiohttp.TraceConfig:
+    "aiohttp tracing hooks that record raw Discord REST calls made outside the bot's HTTP client."
+
+    async def on_start(_session, context, _params) -> None:
+        context.started = time.perf_counter()
+
+    async def on_end(_session, context, params: aiohttp.TraceRequestEndParams) -> None:
+        DISCORD_REST_SECONDS.observe(
+            time.perf_counter() - context.started,
+            method=params.method,
+            route=route_label(params.url.path),
+            status=str(params.response.status),
+        )
+
+    async def on_exception(_session, context, params: aiohttp.TraceRequestExceptionParams) -> None:
+        DISCORD_REST_SECONDS.observe(
+            time.perf_counter() - context.started,
+            method=params.method,
+            route=route_label(params.url.path),
+            status="error",
+        )
+
+    config = aiohttp.TraceConfig()
+    config.on_request_start.append(on_start)
+    config.on_request_end.append(on_end)
+    config.on_request_exception.append(on_exception)
+    return config
+
+
+async def start_metrics_server(port: int, host: str = "127.0.0.1", registry: Registry = REGISTRY) -> web.AppRunner:
+    "Serve registry.render() at /metrics; call cleanup() on the returned runner to stop."
+
+    async def handle(_request: web.Request) -> web.Response:
+        return web.Response(
+            body=registry.render().encode("utf-8"),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    print(f"[metrics] Serving Prometheus metrics on http://{host}:{port}/metrics")
+    return runner
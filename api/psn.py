@@ -1,18 +1,81 @@
-import os
+import asyncio
 import discord
 import aiohttp
-import json
 import re
 import secrets
+from copy import deepcopy
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from dataclasses import dataclass
+from functools import partial
+from dataclasses import dataclass, field, replace
+from math import ceil
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import TypeVar
+from urllib.parse import urlsplit
 from psnawp_api import PSNAWP
 from psnawp_api.core.psnawp_exceptions import PSNAWPNotFoundError as PSNAWPNotFound, PSNAWPAuthenticationError
-from api.common import APIError
+from api.common import APIError, iter_json, json_loads
+from api.accounts import PSNAWPClientCache
+from api.cache import TTLCache
+from api.credentials import CredentialStore
+from api.concurrency import SingleFlight, map_bounded
+from api.storage import AccountIdCache, ProductCatalog, RequestHistory, SkuCacheStore, SQLiteStore
+from api.ratelimit import HostRateLimiter, TokenBucket, parse_retry_after
+from api.metrics import PSN_RATE_LIMIT_WAIT_SECONDS, record_error, register_cache, track_operation
+from api.regions import RegionRanker
+from api.resilience import CircuitBreaker, RetryPolicy
+
+T = TypeVar("T")
 
 USERNAME_PATTERN = re.compile(r"^[a-zA-Z0-9_-]+$")
+# A full SKU is a product ID plus a 4-character suffix (same rule as LinkGen.py).
+FULL_SKU_SUFFIX_RE = re.compile(r"^(?P<product>.+)-[A-Z0-9]{4}$", re.IGNORECASE)
+
+# Connection pool tuning for the shared PlayStation session.
+HTTP_POOL_LIMIT = 100
+HTTP_POOL_LIMIT_PER_HOST = 20
+HTTP_KEEPALIVE_SECS = 60.0
+HTTP_DNS_CACHE_SECS = 300
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=10, sock_read=20)
+
+# (region, product_id) -> default SKU; chihiro mappings are effectively static.
+SKU_CACHE_MAXSIZE = 4096
+SKU_CACHE_TTL_SECS = 6 * 60 * 60
+# Upstream "not found / not in this region" answers; transient failures are never cached.
+NEGATIVE_CACHE_MAXSIZE = 2048
+NEGATIVE_CACHE_TTL_SECS = 5 * 60
+# Entries this close to expiry are refreshed in the background while still being served.
+SKU_REFRESH_AHEAD_SECS = 15 * 60
+# How long past expiry a SKU may still be served (allow_stale) while a refresh runs or PSN is down.
+SKU_STALE_SECS = 60 * 60
+# Request counts behind the cache warmer halve over this period.
+REQUEST_HISTORY_HALF_LIFE_SECS = 3 * 24 * 60 * 60
+# ETag / Last-Modified kept well past the SKU TTL so expired entries can be revalidated cheaply.
+VALIDATOR_CACHE_TTL_SECS = 7 * 24 * 60 * 60
+
+# Per-host token buckets (requests/sec, burst) so batches stay under PlayStation's limits.
+RATE_LIMIT_DEFAULT = (5.0, 10)
+RATE_LIMITS = {
+    "store.playstation.com": (10.0, 20),
+    "web.np.playstation.com": (4.0, 8),
+}
+RATE_LIMIT_DEFAULT_BACKOFF_SECS = 5.0
+RATE_LIMIT_REPORT_SECS = 1.0
+
+# Transient-failure handling: retries apply to idempotent chihiro GETs only; breakers are per host.
+RETRY_POLICY = RetryPolicy(attempts=3, base_delay=0.25, max_delay=4.0)
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_SECS = 30.0
+
+# Most SKUs sent in one cart mutation (or one batched GraphQL POST).
+CART_BATCH_SIZE = 10
+
+# Blocking PSNAWP calls run on their own small pool with a hard timeout.
+PSNAWP_WORKERS = 4
+PSNAWP_TIMEOUT_SECS = 30.0
+# Online IDs can be changed on PSN, so resolved account IDs are trusted for a long but finite time.
+ACCOUNT_ID_TTL_SECS = 30 * 24 * 60 * 60
 
 class PSNOperation(Enum):
     CHECK_AVATAR = 1
@@ -27,31 +90,133 @@ class PSNRequest:
     npsso: str | None = None
     requested_by: str | None = None
 
+@dataclass
+class PSNHttpRequest:
+    url: str
+    headers: dict[str, str]
+    data_json: dict = field(default_factory=dict)
+
+@dataclass
+class PSNHttpResponse:
+    status: int
+    data: dict | list | None
+    etag: str | None = None
+    last_modified: str | None = None
+
+@dataclass
+class ContainerValidators:
+    sku_id: str
+    etag: str | None
+    last_modified: str | None
+
 class PSN:
-    def __init__(self, npsso: str | None, default_pdc: str | None = None, env_path: str | Path | None = None):
-        self.psnawp = None
-        if npsso:
-            try:
-                self.psnawp = PSNAWP(npsso)
-            except Exception:  # pragma: no cover - psnawp handles its own logging
-                print("[psn] Failed to initialize PSNAWP with provided NPSSO; account lookups disabled.")
+    def __init__(
+        self,
+        default_pdc: str | None = None,
+        env_path: str | Path | None = None,
+        cache_path: str | Path | None = None,
+        stale_window: float = SKU_STALE_SECS,
+    ):
+        self.psnawp_clients = PSNAWPClientCache()
+        self._psnawp_executor: ThreadPoolExecutor | None = None
+        # One writer thread keeps SQLite writes off the event loop and applies them in submission order.
+        self._db_writer: ThreadPoolExecutor | None = ThreadPoolExecutor(max_workers=1, thread_name_prefix="psn-db")
+        self._client_flights = SingleFlight()
+        self.store = SQLiteStore(cache_path or ":memory:")
+        self.account_ids = AccountIdCache(self.store, ACCOUNT_ID_TTL_SECS)
+        self.catalog = ProductCatalog(self.store)
+        self.request_history = RequestHistory(self.store, REQUEST_HISTORY_HALF_LIFE_SECS)
 
         self._fallback_pdc = default_pdc
         self.env_path = Path(env_path).resolve() if env_path else None
-
-        # for request
-        self.url = ""
-        self.headers = {}
-        self.data_json = {}
-
-        # for response
-        self.res = {}
+        self.credentials = CredentialStore(self.env_path)
+        self._session: aiohttp.ClientSession | None = None
+        self.sku_cache = TTLCache(SKU_CACHE_MAXSIZE, SKU_CACHE_TTL_SECS, stale_ttl=stale_window)
+        self.sku_store = SkuCacheStore(self.store, SKU_CACHE_MAXSIZE, stale_ttl=stale_window)
+        self._load_sku_cache()
+        self.negative_cache = TTLCache(NEGATIVE_CACHE_MAXSIZE, NEGATIVE_CACHE_TTL_SECS)
+        self.validator_cache = TTLCache(SKU_CACHE_MAXSIZE, VALIDATOR_CACHE_TTL_SECS)
+        self._sku_flights = SingleFlight()
+        self._refreshing: dict[tuple[str, str], asyncio.Task] = {}
+        self.regions = RegionRanker()
+        self.rate_limiter = HostRateLimiter(*RATE_LIMIT_DEFAULT, overrides=RATE_LIMITS)
+        self.retry_policy = RETRY_POLICY
+        self._breakers: dict[str, CircuitBreaker] = {}
+        # None until we learn whether the GraphQL endpoint accepts batched operations.
+        self._graphql_batching: bool | None = None
+
+        register_cache("sku", self.sku_cache.stats)
+        register_cache("sku_negative", self.negative_cache.stats)
+        register_cache("sku_validators", self.validator_cache.stats)
+        register_cache("psnawp_clients", lambda: {
+            "hits": self.psnawp_clients.hits,
+            "misses": self.psnawp_clients.misses,
+            "size": len(self.psnawp_clients),
+        })
+        register_cache("account_ids", lambda: {"hits": self.account_ids.hits, "misses": self.account_ids.misses})
+
+    def _load_sku_cache(self) -> None:
+        rows = self.sku_store.load()
+        # Oldest first so the entries with the most time left end up most recently used.
+        for region, product_id, sku_id, _avatar_url, ttl in reversed(rows):
+            self.sku_cache.set((region, product_id), sku_id, ttl=ttl)
+        if rows:
+            print(f"[psn] Loaded {len(rows)} cached SKU(s) from {self.store.path}.")
+
+    def open_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=HTTP_POOL_LIMIT,
+                limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+                keepalive_timeout=HTTP_KEEPALIVE_SECS,
+                ttl_dns_cache=HTTP_DNS_CACHE_SECS,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=HTTP_TIMEOUT)
+        return self._session
+
+    async def close(self) -> None:
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        executor, self._psnawp_executor = self._psnawp_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        writer, self._db_writer = self._db_writer, None
+        if writer is not None:
+            writer.submit(self.request_history.flush)
+            await asyncio.to_thread(writer.shutdown)
+        self.store.close()
 
     @staticmethod
     def validate_request(req: PSNRequest):
         if req.product_id.count("-") != 2:
             raise APIError("Invalid product ID!")
     
+    @staticmethod
+    def _normalize_request(req: PSNRequest) -> PSNRequest:
+        return replace(req, product_id=req.product_id.strip().upper())
+
+    @staticmethod
+    def split_full_sku(value: str) -> tuple[str, str] | None:
+        "Return (product_id, sku_id) when value is a full SKU rather than a bare product ID."
+        sku_id = value.strip().upper()
+        match = FULL_SKU_SUFFIX_RE.fullmatch(sku_id)
+        if match and match.group("product").count("-") == 2:
+            return match.group("product"), sku_id
+        return None
+
+    def _product_request(self, req: PSNRequest) -> PSNRequest:
+        "Normalize req, reducing a full SKU to its product ID for container lookups."
+        req = self._normalize_request(req)
+        full_sku = self.split_full_sku(req.product_id)
+        return req if full_sku is None else replace(req, product_id=full_sku[0])
+
+    @staticmethod
+    def _cache_key(req: PSNRequest) -> tuple[str, str]:
+        return req.region, req.product_id
+
     @staticmethod
     def _format_region_path(region: str) -> str:
         lang, sep, country = region.partition("-")
@@ -77,19 +242,20 @@ class PSN:
         return cookie_value, npsso_value
 
     def _read_env_cookie(self) -> str | None:
-        if self.env_path and self.env_path.exists():
-            load_dotenv(self.env_path, override=True)
-            value = os.getenv("PDC")
+        if self.env_path and self.credentials.exists():
+            value = self.credentials.get("PDC")
             if value:
                 return value
         return self._fallback_pdc
 
     def has_pdc_fallback(self) -> bool:
-        if self.env_path and self.env_path.exists():
-            load_dotenv(self.env_path, override=True)
-            return bool(os.getenv("PDC"))
+        if self.env_path and self.credentials.exists():
+            return bool(self.credentials.get("PDC"))
         return self._fallback_pdc is not None
 
+    def reload_credentials(self) -> bool:
+        return self.credentials.reload()
+
     @staticmethod
     def _generate_npsso() -> str:
         return secrets.token_hex(32)
@@ -160,13 +326,90 @@ class PSN:
         )
         return any(keyword in lowered for keyword in keywords)
 
-    async def _read_json(self, response: aiohttp.ClientResponse) -> dict:
-        text = await response.text()
+    async def _send(
+        self,
+        method: str,
+        http_request: PSNHttpRequest,
+        body: dict | list | None = None,
+        *,
+        retry: bool = False,
+    ) -> PSNHttpResponse:
+        breaker = self._breaker_for(http_request.url)
+        attempts = max(1, self.retry_policy.attempts) if retry else 1
+
+        for attempt in range(attempts):
+            if not breaker.allow():
+                raise APIError(
+                    f"PlayStation Network appears degraded; skipping requests for {ceil(breaker.retry_in())}s.",
+                    code="degraded",
+                    hints={"cookie": False, "npsso": False},
+                )
+            probing = breaker.state == breaker.HALF_OPEN
+            try:
+                result = await self._send_once(method, http_request, body)
+            except APIError as exc:
+                if exc.code != "unavailable":
+                    # PlayStation answered; the endpoint itself is healthy.
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                if attempt + 1 >= attempts:
+                    raise
+            else:
+                breaker.record_success()
+                return result
+            finally:
+                # Cancellation or an unexpected error records nothing; never leave the probe slot taken.
+                if probing:
+                    breaker.release_probe()
+            await asyncio.sleep(self.retry_policy.backoff(attempt))
+
+    def _breaker_for(self, url: str) -> CircuitBreaker:
+        host = urlsplit(url).hostname or url
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECS)
+        return breaker
+
+    async def _send_once(self, method: str, http_request: PSNHttpRequest, body: dict | list | None) -> PSNHttpResponse:
+        host = urlsplit(http_request.url).hostname or http_request.url
+        waited = await self.rate_limiter.acquire(http_request.url)
+        PSN_RATE_LIMIT_WAIT_SECONDS.observe(waited, host=host)
+        if waited >= RATE_LIMIT_REPORT_SECS:
+            print(f"[psn] Rate limiter queued {method} {host} for {waited:.2f}s")
+
+        session = self.open_session()
+        try:
+            async with session.request(method, http_request.url, headers=http_request.headers, json=body) as response:
+                if response.status == 429:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"), RATE_LIMIT_DEFAULT_BACKOFF_SECS)
+                    self.rate_limiter.pause(http_request.url, retry_after)
+                    raise APIError(
+                        f"PlayStation is rate limiting requests. Try again in {ceil(retry_after)}s.",
+                        code="throttled",
+                        hints={"cookie": False, "npsso": False},
+                    )
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+                if response.status == 304:
+                    return PSNHttpResponse(304, None, etag, last_modified)
+                data = await self._read_json(response)
+                return PSNHttpResponse(response.status, data, etag, last_modified)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            raise APIError(
+                "Could not reach the PlayStation Store. Try again shortly.",
+                code="unavailable",
+                hints={"cookie": False, "npsso": False},
+            ) from exc
+
+    async def _read_json(self, response: aiohttp.ClientResponse) -> dict | list:
+        body = await response.read()
 
         try:
-            data = json.loads(text) if text else {}
-        except json.JSONDecodeError as exc:
-            raise APIError("Unexpected response from PlayStation API.", code=None) from exc
+            data = json_loads(body) if body else {}
+        except ValueError as exc:
+            code = "unavailable" if response.status >= 500 else None
+            raise APIError("Unexpected response from PlayStation API.", code=code) from exc
 
         if response.status >= 400:
             message = None
@@ -180,181 +423,562 @@ class PSN:
                 message = f"PlayStation API returned status {response.status}."
             cookie_hint, npsso_hint = self._classify_auth_components(message, response.status)
             hints = {"cookie": cookie_hint, "npsso": npsso_hint}
-            code = "auth" if response.status in {401, 403} or self._looks_like_auth_error(message) else None
+            if response.status in {401, 403}:
+                code = "auth"
+            elif response.status >= 500:
+                code = "unavailable"
+            elif self._looks_like_auth_error(message):
+                code = "auth"
+            elif response.status == 404:
+                code = "not_found"
+            else:
+                code = None
             raise APIError(message, code=code, hints=hints)
 
         return data
         
-    def get_error_cause(self) -> str:
-        return self.res.get("cause")
+    @staticmethod
+    def get_error_cause(res: dict) -> str:
+        return res.get("cause")
     
-    def get_error(self) -> str | None:
-        if "subTotalPrice" in str(self.res):
+    @staticmethod
+    def get_error(res: dict) -> str | None:
+        if any(key == "subTotalPrice" for key, _ in iter_json(res.get("data"))):
             return None
 
-        elif self.res.get("errors"):
-            return self.res["errors"][0]["message"]
+        elif res.get("errors"):
+            return res["errors"][0]["message"]
         return None
 
-    def request_builder(self, request: PSNRequest, operation: PSNOperation) -> None:
+    def request_builder(self, request: PSNRequest, operation: PSNOperation) -> PSNHttpRequest:
         region_path = self._format_region_path(request.region)
 
         match operation:
             case PSNOperation.CHECK_AVATAR:
-                self.url = f"https://store.playstation.com/store/api/chihiro/00_09_000/container/{region_path}/19/{request.product_id}/"
-                self.headers = {
-                "Origin": "https://checkout.playstation.com",
-                "content-type": "application/json",
-                "Accept-Language": request.region,
-                }
-                return
+                return PSNHttpRequest(
+                    url=f"https://store.playstation.com/store/api/chihiro/00_09_000/container/{region_path}/19/{request.product_id}/",
+                    headers={
+                    "Origin": "https://checkout.playstation.com",
+                    "content-type": "application/json",
+                    "Accept-Language": request.region,
+                    },
+                )
 
         cookie_value, npsso_value = self._resolve_credentials(request)
 
         match operation:
             case PSNOperation.ADD_TO_CART:
-                self.url = "https://web.np.playstation.com/api/graphql/v1/op"
-                self.headers = {
-                "Origin": "https://checkout.playstation.com",
-                "content-type": "application/json",
-                "Accept-Language": request.region,
-                "apollographql-client-name": "@sie-ppr-web-checkout/app",
-                "Cookie": f"AKA_A2=A; pdccws_p={cookie_value}; isSignedIn=true; userinfo={npsso_value}; p=0; gpdcTg=%5B1%5D"
-                }
-                self.data_json = {
-                    "operationName": "addToCart",
-                    "variables": {
-                        "skus": [{"skuId": ""}]
+                return PSNHttpRequest(
+                    url="https://web.np.playstation.com/api/graphql/v1/op",
+                    headers={
+                    "Origin": "https://checkout.playstation.com",
+                    "content-type": "application/json",
+                    "Accept-Language": request.region,
+                    "apollographql-client-name": "@sie-ppr-web-checkout/app",
+                    "Cookie": f"AKA_A2=A; pdccws_p={cookie_value}; isSignedIn=true; userinfo={npsso_value}; p=0; gpdcTg=%5B1%5D"
                     },
-                    "extensions": {
-                        "persistedQuery": {
-                            "version": 1,
-                            "sha256Hash": "b6ac14d8bb153d4ed115bc8135237728e03e5cb8b3ad2680311db7b356f16cd9"
+                    data_json={
+                        "operationName": "addToCart",
+                        "variables": {
+                            "skus": [{"skuId": ""}]
+                        },
+                        "extensions": {
+                            "persistedQuery": {
+                                "version": 1,
+                                "sha256Hash": "b6ac14d8bb153d4ed115bc8135237728e03e5cb8b3ad2680311db7b356f16cd9"
+                            }
                         }
-                    }
-                }
+                    },
+                )
 
             case PSNOperation.REMOVE_FROM_CART:
-                self.url = "https://web.np.playstation.com/api/graphql/v1/op"
-                self.headers = {
-                "Origin": "https://checkout.playstation.com",
-                "content-type": "application/json",
-                "Accept-Language": request.region,
-                "apollographql-client-name": "@sie-ppr-web-checkout/app",
-                "Cookie": f"AKA_A2=A; pdccws_p={cookie_value}; isSignedIn=true; userinfo={npsso_value}; p=0; gpdcTg=%5B1%5D"
-                }
-                self.data_json = {
-                    "operationName": "removeFromCart",
-                    "variables": {
-                        "skuId": ""
+                return PSNHttpRequest(
+                    url="https://web.np.playstation.com/api/graphql/v1/op",
+                    headers={
+                    "Origin": "https://checkout.playstation.com",
+                    "content-type": "application/json",
+                    "Accept-Language": request.region,
+                    "apollographql-client-name": "@sie-ppr-web-checkout/app",
+                    "Cookie": f"AKA_A2=A; pdccws_p={cookie_value}; isSignedIn=true; userinfo={npsso_value}; p=0; gpdcTg=%5B1%5D"
                     },
-                    "extensions": {
-                        "persistedQuery": {
-                            "version": 1,
-                            "sha256Hash": "3be90da9dcb3d6f500a40fbbd42b7e2b83a40b493c6b1ff41cf50478797bd47d"
+                    data_json={
+                        "operationName": "removeFromCart",
+                        "variables": {
+                            "skuId": ""
+                        },
+                        "extensions": {
+                            "persistedQuery": {
+                                "version": 1,
+                                "sha256Hash": "3be90da9dcb3d6f500a40fbbd42b7e2b83a40b493c6b1ff41cf50478797bd47d"
+                            }
                         }
-                    }
-                }
-    
-    def insert_skuId_deep(self, skuId: str) -> None:
-        self.data_json["variables"]["skus"][0]["skuId"] = skuId
-    
-    def insert_skuId(self, sku_Id: str) -> None:
-        self.data_json["variables"]["skuId"] = sku_Id
+                    },
+                )
 
-    async def check_avatar(self, request: PSNRequest, obtain_skuget_only: bool = False) -> str:
+        raise ValueError(f"Unsupported PSN operation: {operation}")
+    
+    @staticmethod
+    def insert_skuId(http_request: PSNHttpRequest, sku_Id: str) -> None:
+        http_request.data_json["variables"]["skuId"] = sku_Id
+
+    async def resolve_sku(self, request: PSNRequest, allow_stale: bool = False) -> str:
+        request = self._normalize_request(request)
+        # Users often paste the full SKU already; it needs no chihiro round trip.
+        full_sku = self.split_full_sku(request.product_id)
+        if full_sku is not None:
+            return full_sku[1]
         self.validate_request(request)
-        self.request_builder(request, PSNOperation.CHECK_AVATAR)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(self.url, headers=self.headers) as response:
-                self.res = await self._read_json(response)
+        key = self._cache_key(request)
+        cached = self.sku_cache.lookup(key, allow_stale=allow_stale)
+        if cached is not None:
+            sku_id, ttl_left = cached
+            if ttl_left <= SKU_REFRESH_AHEAD_SECS:
+                self._refresh_sku(request, key)
+            return sku_id
+
+        known_missing = self.negative_cache.get(key)
+        if known_missing is not None:
+            raise APIError(known_missing.message, code=known_missing.code, hints=dict(known_missing.hints))
+
+        return await self._sku_flights.do(key, lambda: self._load_sku(request, key))
 
-        sku_get = self.res.get("default_sku", {}).get("id")
+    def _persist(self, func: Callable[..., object], *args, **kwargs) -> None:
+        "Queue a SQLite write on the writer thread; dropped once the client is closed."
+        if self._db_writer is None:
+            return
+        self._db_writer.submit(func, *args, **kwargs).add_done_callback(self._report_persist_error)
+
+    @staticmethod
+    def _report_persist_error(future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            print(f"[psn] Cache write failed: {future.exception()!r}")
+
+    async def _load_sku(self, request: PSNRequest, key: tuple[str, str]) -> str:
+        validators = self.validator_cache.get(key)
+        try:
+            with track_operation("chihiro_lookup"):
+                sku_get = await self._fetch_sku(request, key, validators)
+        except APIError as exc:
+            if exc.code == "not_found":
+                self.validator_cache.pop(key)
+                self.sku_cache.pop(key)
+                self._persist(self.sku_store.delete, request.region, request.product_id)
+                # Delisted here: the outage fallback must not keep offering it.
+                self._persist(self.catalog.delete, request.product_id, request.region)
+                self.negative_cache.set(key, exc)
+            elif exc.code in {"unavailable", "degraded"}:
+                # PSN is unreachable (or its breaker is open): answer from the catalog if this product was seen here before.
+                known = self.catalog.get(request.product_id, request.region)
+                if known is not None:
+                    print(f"[psn] Serving {request.product_id} ({request.region}) from the local catalog: {exc}")
+                    return known.sku_id
+            raise
+        self.sku_cache.set(key, sku_get)
+        self._persist(self.sku_store.set, request.region, request.product_id, sku_get, self._avatar_url(request), SKU_CACHE_TTL_SECS)
+        self.regions.record_hit(request.product_id, request.region)
+        return sku_get
+
+    def record_request(self, request: PSNRequest) -> None:
+        request = self._product_request(request)
+        self.request_history.record(request.region, request.product_id)
+
+    async def warm_sku_cache(self, limit: int, rate: float) -> int:
+        "Pre-resolve the most requested products that are missing or about to expire, at most `rate` lookups per second."
+        budget = TokenBucket(rate, 1)
+        warmed = 0
+        if self._db_writer is None:
+            return 0
+        ranked = await asyncio.wrap_future(self._db_writer.submit(self.request_history.top, limit))
+        for region, product_id in ranked:
+            key = (region, product_id)
+            remaining = self.sku_cache.remaining(key)
+            if remaining is not None and remaining > SKU_REFRESH_AHEAD_SECS:
+                continue
+            if key in self.negative_cache:
+                continue
+            request = PSNRequest(region=region, product_id=product_id, requested_by="cache warmer")
+            await budget.acquire()
+            try:
+                await self._sku_flights.do(key, lambda: self._load_sku(request, key))
+            except APIError as exc:
+                if exc.code in {"throttled", "unavailable", "degraded"}:
+                    print(f"[psn] Cache warm-up stopped early: {exc}")
+                    break
+                continue
+            warmed += 1
+        return warmed
+
+    def _refresh_sku(self, request: PSNRequest, key: tuple[str, str]) -> None:
+        "Reload an expiring or stale entry off the request path; at most one refresh per key at a time."
+        if key in self._refreshing:
+            return
+
+        async def refresh() -> None:
+            try:
+                await self._sku_flights.do(key, lambda: self._load_sku(request, key))
+            except Exception as exc:
+                print(f"[psn] Background refresh of {request.product_id} ({request.region}) failed: {exc!r}")
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _fetch_sku(
+        self,
+        request: PSNRequest,
+        key: tuple[str, str],
+        validators: ContainerValidators | None = None,
+    ) -> str:
+        http_request = self.request_builder(request, PSNOperation.CHECK_AVATAR)
+        if validators is not None:
+            if validators.etag:
+                http_request.headers["If-None-Match"] = validators.etag
+            if validators.last_modified:
+                http_request.headers["If-Modified-Since"] = validators.last_modified
+
+        response = await self._send("GET", http_request, retry=True)
+        if response.status == 304 and validators is not None:
+            # Container unchanged: keep the stored SKU and skip downloading/parsing the body.
+            self.validator_cache.set(key, validators)
+            self._persist(self.catalog.touch, request.product_id, request.region)
+            return validators.sku_id
+
+        res = response.data if isinstance(response.data, dict) else {}
+        sku_get = res.get("default_sku", {}).get("id")
         if sku_get is None:
-            message = self.get_error_cause() or "Unable to locate the requested avatar."
+            message = self.get_error_cause(res) or "Unable to locate the requested avatar."
             cookie_hint, npsso_hint = self._classify_auth_components(message, None)
-            code = "auth" if self._looks_like_auth_error(message) else None
+            code = "auth" if self._looks_like_auth_error(message) else "not_found"
             raise APIError(message, code=code, hints={"cookie": cookie_hint, "npsso": npsso_hint})
+        if response.etag or response.last_modified:
+            self.validator_cache.set(key, ContainerValidators(sku_get, response.etag, response.last_modified))
+        self._persist(
+            self.catalog.record,
+            request.product_id,
+            request.region,
+            sku_get,
+            name=res.get("name") or res.get("default_sku", {}).get("name"),
+            image_url=self._container_image(res) or self._avatar_url(request),
+        )
+        return sku_get
+
+    @staticmethod
+    def _container_image(res: dict) -> str | None:
+        for image in res.get("images") or ():
+            if isinstance(image, dict) and image.get("url"):
+                return image["url"]
+        return None
+
+    def _avatar_url(self, request: PSNRequest) -> str:
+        region_path = self._format_region_path(request.region)
+        return f"https://store.playstation.com/store/api/chihiro/00_09_000/container/{region_path}/19/{request.product_id}/image"
+
+    async def check_avatar(
+        self,
+        request: PSNRequest,
+        obtain_skuget_only: bool = False,
+        allow_stale: bool = False,
+    ) -> str:
+        request = self._product_request(request)
+        sku_get = await self.resolve_sku(request, allow_stale=allow_stale)
         if obtain_skuget_only:
             return sku_get
-        
-        region_path = self._format_region_path(request.region)
-        picture_avatar = f"https://store.playstation.com/store/api/chihiro/00_09_000/container/{region_path}/19/{request.product_id}/image"
-        return picture_avatar
+        return self._avatar_url(request)
+
+    async def sweep_regions(
+        self,
+        product_id: str,
+        regions: list[str],
+        concurrency: int,
+        requested_by: str | None = None,
+        stop_at_first: bool = False,
+    ) -> dict[str, str | Exception]:
+        "Resolve one product in the given regions; maps region -> SKU or the exception raised there."
+        base_request = self._product_request(
+            PSNRequest(region="", product_id=product_id, requested_by=requested_by)
+        )
+        self.validate_request(base_request)
+        # Searching for any region: try the likeliest ones a wave at a time and stop after the first hit.
+        if stop_at_first:
+            regions = self.regions.order(base_request.product_id, regions)
+            waves = [regions[i : i + concurrency] for i in range(0, len(regions), max(1, concurrency))]
+        else:
+            waves = [regions]
+
+        matrix: dict[str, str | Exception] = {}
+        for wave in waves:
+            requests = [replace(base_request, region=region) for region in wave]
+            outcomes = await map_bounded(self.resolve_sku, requests, concurrency)
+            matrix.update(zip(wave, outcomes))
+            if stop_at_first and any(not isinstance(outcome, Exception) for outcome in outcomes):
+                break
+        return matrix
+
+    def _cart_error(self, message: str) -> APIError:
+        cookie_hint, npsso_hint = self._classify_auth_components(message, None)
+        code = "auth" if self._looks_like_auth_error(message) else None
+        return APIError(message, code=code, hints={"cookie": cookie_hint, "npsso": npsso_hint})
+
+    async def _post_graphql(self, http_request: PSNHttpRequest, body: dict | list | None = None) -> dict | list:
+        payload = http_request.data_json if body is None else body
+        response = await self._send("POST", http_request, payload)
+        return response.data
+
+    def _build_cart_request(self, request: PSNRequest, operation: PSNOperation, sku_ids: list[str]) -> PSNHttpRequest:
+        http_request = self.request_builder(request, operation)
+        if operation == PSNOperation.ADD_TO_CART:
+            http_request.data_json["variables"]["skus"] = [{"skuId": sku_id} for sku_id in sku_ids]
+        else:
+            self.insert_skuId(http_request, sku_ids[0])
+        return http_request
+
+    def _attribute_cart_errors(self, res: dict, sku_ids: list[str]) -> tuple[dict[str, APIError], list[str]]:
+        "Split GraphQL errors into those naming a SKU from the batch and those that do not."
+        attributed: dict[str, APIError] = {}
+        unattributed: list[str] = []
+        for error in res.get("errors") or []:
+            if not isinstance(error, dict):
+                continue
+            message = error.get("message") or "PlayStation rejected the cart update."
+            strings = [value for _, value in iter_json(error) if isinstance(value, str)]
+            matched = [sku_id for sku_id in sku_ids if any(sku_id in value for value in strings)]
+            if not matched:
+                unattributed.append(message)
+            for sku_id in matched:
+                attributed.setdefault(sku_id, self._cart_error(message))
+        return attributed, unattributed
+
+    async def _mutate_one(self, request: PSNRequest, operation: PSNOperation, sku_id: str) -> APIError | None:
+        http_request = self._build_cart_request(request, operation, [sku_id])
+        try:
+            res = await self._post_graphql(http_request)
+        except APIError as exc:
+            return exc
+        err = self.get_error(res)
+        return None if err is None else self._cart_error(err)
+
+    @staticmethod
+    def _has_cart(res: dict) -> bool:
+        return any(key == "subTotalPrice" for key, _ in iter_json(res.get("data")))
+
+    async def _add_chunk(self, request: PSNRequest, sku_ids: list[str]) -> dict[str, APIError | None]:
+        if len(sku_ids) == 1:
+            return {sku_ids[0]: await self._mutate_one(request, PSNOperation.ADD_TO_CART, sku_ids[0])}
+
+        http_request = self._build_cart_request(request, PSNOperation.ADD_TO_CART, sku_ids)
+        try:
+            res = await self._post_graphql(http_request)
+        except APIError as exc:
+            return {sku_id: exc for sku_id in sku_ids}
+
+        outcomes: dict[str, APIError | None] = {}
+        attributed, unattributed = self._attribute_cart_errors(res, sku_ids)
+        outcomes.update(attributed)
+        remaining = [sku_id for sku_id in sku_ids if sku_id not in attributed]
+
+        # A returned cart means the mutation went through (get_error's rule); only SKUs named in an error failed.
+        if self._has_cart(res) or not unattributed or not remaining:
+            outcomes.update((sku_id, None) for sku_id in remaining)
+        elif len(remaining) == 1 or self._looks_like_auth_error(unattributed[0]):
+            error = self._cart_error(unattributed[0])
+            outcomes.update((sku_id, error) for sku_id in remaining)
+        else:
+            # The mutation failed without naming a SKU; isolate the culprit one item at a time.
+            for sku_id in remaining:
+                outcomes[sku_id] = await self._mutate_one(request, PSNOperation.ADD_TO_CART, sku_id)
+        return outcomes
+
+    async def _remove_chunk(self, request: PSNRequest, sku_ids: list[str]) -> dict[str, APIError | None]:
+        if len(sku_ids) > 1 and self._graphql_batching is not False:
+            # Apollo-style transport batching: one POST carrying an array of operations.
+            # One request (and one set of credentials) for the POST; each operation body differs only in skuId.
+            http_request = self._build_cart_request(request, PSNOperation.REMOVE_FROM_CART, sku_ids)
+            bodies = []
+            for sku_id in sku_ids:
+                body = deepcopy(http_request.data_json)
+                body["variables"]["skuId"] = sku_id
+                bodies.append(body)
+            try:
+                res = await self._post_graphql(http_request, bodies)
+            except APIError as exc:
+                # Only a definite 2xx/4xx answer says anything about batching support.
+                if exc.code in {"auth", "throttled", "unavailable", "degraded"}:
+                    return {sku_id: exc for sku_id in sku_ids}
+                res = None
+            if isinstance(res, list) and len(res) == len(sku_ids):
+                self._graphql_batching = True
+                outcomes: dict[str, APIError | None] = {}
+                for sku_id, item in zip(sku_ids, res):
+                    err = self.get_error(item) if isinstance(item, dict) else "Unexpected response from PlayStation API."
+                    outcomes[sku_id] = None if err is None else self._cart_error(err)
+                return outcomes
+            print("[psn] GraphQL batching unavailable; sending cart removals individually.")
+            self._graphql_batching = False
+
+        return {sku_id: await self._mutate_one(request, PSNOperation.REMOVE_FROM_CART, sku_id) for sku_id in sku_ids}
+
+    async def mutate_cart(
+        self,
+        request: PSNRequest,
+        operation: PSNOperation,
+        sku_ids: list[str],
+    ) -> dict[str, APIError | None]:
+        "Apply one cart operation to many SKUs using request's region and credentials; returns an outcome per SKU."
+        unique_ids = list(dict.fromkeys(sku_ids))
+        outcomes: dict[str, APIError | None] = {}
+        for start in range(0, len(unique_ids), CART_BATCH_SIZE):
+            chunk = unique_ids[start : start + CART_BATCH_SIZE]
+            if operation == PSNOperation.ADD_TO_CART:
+                label, mutate = "add_to_cart", self._add_chunk
+            elif operation == PSNOperation.REMOVE_FROM_CART:
+                label, mutate = "remove_from_cart", self._remove_chunk
+            else:
+                raise ValueError(f"Unsupported cart operation: {operation}")
+            with track_operation(label):
+                chunk_outcomes = await mutate(request, chunk)
+            for error in chunk_outcomes.values():
+                if error is not None:
+                    record_error(label, error)
+            outcomes.update(chunk_outcomes)
+        return outcomes
 
     async def add_to_cart(self, request: PSNRequest) -> None:
-        sku_id = await self.check_avatar(request, obtain_skuget_only=True)
-        self.request_builder(request, PSNOperation.ADD_TO_CART)
-        self.insert_skuId_deep(sku_id)
-            
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.url, headers=self.headers, json=self.data_json) as response:
-                self.res = await self._read_json(response)
-
-        err = self.get_error()
-        if err is not None:
-            cookie_hint, npsso_hint = self._classify_auth_components(err, None)
-            code = "auth" if self._looks_like_auth_error(err) else None
-            raise APIError(err, code=code, hints={"cookie": cookie_hint, "npsso": npsso_hint})
+        sku_id = await self.resolve_sku(request)
+        error = (await self.mutate_cart(request, PSNOperation.ADD_TO_CART, [sku_id]))[sku_id]
+        if error is not None:
+            raise error
 
     async def remove_from_cart(self, request: PSNRequest) -> None:
-        sku_id = await self.check_avatar(request, obtain_skuget_only=True)
-        self.request_builder(request, PSNOperation.REMOVE_FROM_CART)
-        self.insert_skuId(sku_id)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.url, headers=self.headers, json=self.data_json) as response:
-                self.res = await self._read_json(response)
+        sku_id = await self.resolve_sku(request)
+        error = (await self.mutate_cart(request, PSNOperation.REMOVE_FROM_CART, [sku_id]))[sku_id]
+        if error is not None:
+            raise error
 
-        err = self.get_error()
-        if err is not None:
-            cookie_hint, npsso_hint = self._classify_auth_components(err, None)
-            code = "auth" if self._looks_like_auth_error(err) else None
-            raise APIError(err, code=code, hints={"cookie": cookie_hint, "npsso": npsso_hint})
+    def _psnawp_pool(self) -> ThreadPoolExecutor:
+        if self._psnawp_executor is None:
+            self._psnawp_executor = ThreadPoolExecutor(max_workers=PSNAWP_WORKERS, thread_name_prefix="psnawp")
+        return self._psnawp_executor
 
-    async def obtain_account_id(self, username: str, npsso: str | None) -> str:
-        if not npsso or not npsso.strip():
-            raise APIError(
-                "NPSSO token is required for account lookups. Provide it with the command.",
-                code="auth",
-                hints={"cookie": False, "npsso": True},
-            )
+    @staticmethod
+    def _psnawp_timeout() -> APIError:
+        return APIError(
+            "PlayStation account lookup timed out. Try again shortly.",
+            code="unavailable",
+            hints={"cookie": False, "npsso": False},
+        )
 
-        token = npsso.strip()
+    async def _run_psnawp(self, func: Callable[..., T], *args, lock: asyncio.Lock | None = None) -> T:
+        "Run a blocking PSNAWP call on the dedicated pool so Sony round trips never stall the event loop."
+        loop = asyncio.get_running_loop()
+        # Waiting for the client lock counts against the same budget as the call itself.
+        deadline = loop.time() + PSNAWP_TIMEOUT_SECS
+        if lock is not None:
+            try:
+                await asyncio.wait_for(lock.acquire(), PSNAWP_TIMEOUT_SECS)
+            except asyncio.TimeoutError as exc:
+                raise self._psnawp_timeout() from exc
+        try:
+            job = self._psnawp_pool().submit(partial(func, *args))
+        except BaseException:
+            if lock is not None:
+                lock.release()
+            raise
+        future = asyncio.wrap_future(job)
+
+        def finished(done: asyncio.Future) -> None:
+            # The lock follows the worker thread, not the awaiting coroutine, so a timed-out call still blocks its client.
+            if lock is not None:
+                lock.release()
+            if not done.cancelled():
+                done.exception()
+
+        future.add_done_callback(finished)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError as exc:
+            # A job still queued is dropped; one already running finishes in the background.
+            job.cancel()
+            raise self._psnawp_timeout() from exc
+
+    async def obtain_account_ids(
+        self,
+        usernames: list[str],
+        npsso: str | None,
+        concurrency: int,
+    ) -> list[str | Exception]:
+        "Resolve many usernames through the shared client cache; results keep input order."
+        return await map_bounded(lambda name: self.obtain_account_id(name, npsso), usernames, concurrency)
+
+    def has_cached_account_id(self, username: str) -> bool:
+        return self.account_ids.contains(username.strip())
+
+    async def _lookup_user(self, token: str, username: str):
+        psnawp_client = self.psnawp_clients.cached(token)
+        if psnawp_client is None:
+            try:
+                psnawp_client = await self._client_flights.do(
+                    self.psnawp_clients.key(token), lambda: self._run_psnawp(PSNAWP, token)
+                )
+            except PSNAWPAuthenticationError as exc:
+                raise APIError(
+                    "Invalid or expired NPSSO token. Generate a fresh NPSSO cookie from your PlayStation session and try again.",
+                    code="auth",
+                    hints={"cookie": False, "npsso": True},
+                ) from exc
+            except APIError:
+                raise
+            except Exception as exc:  # pragma: no cover - psnawp handles own logging
+                raise APIError(
+                    "Unable to initialize PlayStation client with the supplied NPSSO token.",
+                    code="auth",
+                    hints={"cookie": False, "npsso": True},
+                ) from exc
+            self.psnawp_clients.store(token, psnawp_client)
 
         try:
-            psnawp_client = PSNAWP(token)
+            user = await self._run_psnawp(
+                partial(psnawp_client.user, online_id=username), lock=self.psnawp_clients.lock(token)
+            )
         except PSNAWPAuthenticationError as exc:
+            self.psnawp_clients.evict(token)
             raise APIError(
                 "Invalid or expired NPSSO token. Generate a fresh NPSSO cookie from your PlayStation session and try again.",
                 code="auth",
                 hints={"cookie": False, "npsso": True},
             ) from exc
-        except Exception as exc:  # pragma: no cover - psnawp handles own logging
-            raise APIError(
-                "Unable to initialize PlayStation client with the supplied NPSSO token.",
-                code="auth",
-                hints={"cookie": False, "npsso": True},
-            ) from exc
+        except PSNAWPNotFound:
+            self.psnawp_clients.renew(token, psnawp_client)
+            raise APIError("User not found!", code="not_found")
 
+        self.psnawp_clients.renew(token, psnawp_client)
+        return user
+
+    async def obtain_account_id(self, username: str, npsso: str | None) -> str:
+        username = username.strip()
         if len(username) < 3 or len(username) > 16:
             raise APIError("Invalid username!")
         elif not bool(USERNAME_PATTERN.fullmatch(username)):
             raise APIError("Invalid username!")
 
-        try:
-            user = psnawp_client.user(online_id=username)
-        except PSNAWPAuthenticationError as exc:
+        cached = self.account_ids.get(username)
+        if cached is not None:
+            return cached
+
+        if not npsso or not npsso.strip():
             raise APIError(
-                "Invalid or expired NPSSO token. Generate a fresh NPSSO cookie from your PlayStation session and try again.",
+                "NPSSO token is required for account lookups. Provide it with the command.",
                 code="auth",
                 hints={"cookie": False, "npsso": True},
-            ) from exc
-        except PSNAWPNotFound:
-            raise APIError("User not found!")
+            )
+
+        token = npsso.strip()
+
+        with track_operation("psnawp_user_lookup"):
+            user = await self._lookup_user(token, username)
 
         user_id = hex(int(user.account_id))  # convert decimal to hex
         user_id = user_id[2:]  # remove 0x
         user_id = user_id.zfill(16)  # pad to 16 length with zeros
+        self._persist(self.account_ids.set, username, user_id)
         return user_id
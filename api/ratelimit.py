@@ -0,0 +1,88 @@
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    "Async token bucket; callers queue in arrival order until a token (and any Retry-After pause) is available."
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def pause(self, seconds: float) -> None:
+        self._blocked_until = max(self._blocked_until, time.monotonic() + max(0.0, seconds))
+        self._tokens = 0.0
+
+    async def acquire(self) -> float:
+        "Take one token and return how long the caller was queued, in seconds."
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        break
+                    wait = (1 - self._tokens) / self.rate
+                await asyncio.sleep(wait)
+
+        return time.monotonic() - started
+
+
+class HostRateLimiter:
+    "One TokenBucket per host, created on first use."
+
+    def __init__(
+        self,
+        default_rate: float,
+        default_capacity: int,
+        overrides: dict[str, tuple[float, int]] | None = None,
+    ) -> None:
+        self.default_rate = default_rate
+        self.default_capacity = default_capacity
+        self.overrides = dict(overrides or {})
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).hostname or url
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate, capacity = self.overrides.get(host, (self.default_rate, self.default_capacity))
+            bucket = self._buckets[host] = TokenBucket(rate, capacity)
+        return bucket
+
+    async def acquire(self, url: str) -> float:
+        return await self.bucket(url).acquire()
+
+    def pause(self, url: str, seconds: float) -> None:
+        self.bucket(url).pause(seconds)
+
+
+def parse_retry_after(value: str | None, default: float) -> float:
+    "Parse a Retry-After header given either as delta-seconds or an HTTP date."
+    if not value:
+        return default
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    return max(0.0, moment.timestamp() - time.time())
@@ -0,0 +1,71 @@
+import re
+from collections import Counter
+
+PRODUCT_PREFIX_RE = re.compile(r"^(?P<prefix>[A-Z]{2})\d{4}-", re.IGNORECASE)
+
+# Storefronts each publisher prefix is normally released to, most likely first.
+PREFIX_REGIONS: dict[str, tuple[str, ...]] = {
+    "EP": (
+        "en-GB", "de-DE", "fr-FR", "es-ES", "it-IT", "nl-NL", "pl-PL", "pt-PT",
+        "en-AU", "en-NZ", "en-AE", "en-SA", "en-IN", "en-ZA", "ru-RU", "tr-TR",
+        "de-AT", "de-CH", "fr-BE", "nl-BE", "da-DK", "fi-FI", "no-NO", "sv-SE",
+        "cs-CZ", "hu-HU", "el-GR", "ro-RO", "en-IL",
+    ),
+    "UP": (
+        "en-US", "en-CA", "fr-CA", "es-MX", "pt-BR", "es-AR", "es-CL", "es-CO",
+        "es-PE", "es-CR", "es-EC", "es-PA", "es-GT", "es-HN", "es-SV", "es-PY",
+    ),
+    "JP": ("ja-JP",),
+    "HP": (
+        "zh-HK", "en-HK", "zh-TW", "en-TW", "en-SG", "en-MY", "en-TH", "th-TH",
+        "en-ID", "id-ID", "vi-VN", "ch-HK", "ch-TW", "zh-CN",
+    ),
+    "KP": ("ko-KR",),
+}
+
+
+def product_prefix(product_id: str) -> str | None:
+    match = PRODUCT_PREFIX_RE.match((product_id or "").strip())
+    return match.group("prefix").upper() if match else None
+
+
+def region_country(region: str) -> str:
+    return region.rpartition("-")[2].upper()
+
+
+class RegionRanker:
+    "Orders candidate regions by how likely they are to carry a product: prefix hit history, then the prefix's home storefronts."
+
+    def __init__(self, prefix_regions: dict[str, tuple[str, ...]] | None = None) -> None:
+        self.prefix_regions = prefix_regions if prefix_regions is not None else PREFIX_REGIONS
+        self._hits: dict[str, Counter] = {}
+
+    def record_hit(self, product_id: str, region: str) -> None:
+        prefix = product_prefix(product_id)
+        if prefix is not None:
+            self._hits.setdefault(prefix, Counter())[region] += 1
+
+    def order(self, product_id: str, regions: list[str]) -> list[str]:
+        "Return `regions` reordered; same-country language variants follow each preferred region (ar-AE -> en-AE)."
+        candidates = list(dict.fromkeys(regions))
+        prefix = product_prefix(product_id)
+        history = self._hits.get(prefix or "", Counter())
+        preferred = [region for region, _ in history.most_common()]
+        preferred.extend(self.prefix_regions.get(prefix or "", ()))
+
+        by_country: dict[str, list[str]] = {}
+        for region in candidates:
+            by_country.setdefault(region_country(region), []).append(region)
+        for siblings in by_country.values():
+            siblings.sort(key=lambda region: not region.startswith("en-"))
+
+        ordered: dict[str, None] = {}
+        for region in preferred:
+            if region not in by_country.get(region_country(region), ()):
+                continue
+            ordered[region] = None
+            for sibling in by_country[region_country(region)]:
+                ordered.setdefault(sibling, None)
+        for region in candidates:
+            ordered.setdefault(region, None)
+        return list(ordered)
@@ -0,0 +1,70 @@
+import random
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int = 3
+    base_delay: float = 0.25
+    max_delay: float = 4.0
+
+    def backoff(self, attempt: int) -> float:
+        "Full-jitter exponential backoff for the given zero-based attempt."
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    "Opens after consecutive failures, fails fast while open and lets a single probe through after the cooldown."
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == self.OPEN and now - self._opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        # A probe that never reported back (e.g. a hung request) stops blocking others after another cooldown.
+        if self.state == self.HALF_OPEN and (not self._probe_in_flight or now - self._probe_started >= self.reset_timeout):
+            self._probe_in_flight = True
+            self._probe_started = now
+            return True
+        return False
+
+    def retry_in(self) -> float:
+        if self.state == self.CLOSED:
+            return 0.0
+        started = self._probe_started if self.state == self.HALF_OPEN else self._opened_at
+        return max(0.0, self.reset_timeout - (time.monotonic() - started))
+
+    def release_probe(self) -> None:
+        "Let the next caller probe when the current probe ended without a verdict (cancelled or crashed)."
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                print(f"[psn] Circuit opened after {self.failures} consecutive failure(s).")
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
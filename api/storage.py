@@ -0,0 +1,290 @@
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+
+class SQLiteStore:
+    "One SQLite file shared by the bot's persistent caches; ':memory:' keeps everything in-process."
+
+    def __init__(self, path: str | Path = ":memory:") -> None:
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class AccountIdCache:
+    "Persistent, case-insensitive online ID -> account ID map."
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS account_ids (
+            online_id TEXT PRIMARY KEY COLLATE NOCASE,
+            account_id TEXT NOT NULL,
+            resolved_at REAL NOT NULL
+        )
+    """
+
+    def __init__(self, store: SQLiteStore, ttl: float) -> None:
+        self.store = store
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        store.conn.execute(self.SCHEMA)
+
+    def get(self, online_id: str) -> str | None:
+        row = self.store.conn.execute(
+            "SELECT account_id FROM account_ids WHERE online_id = ? AND resolved_at > ?",
+            (online_id, time.time() - self.ttl),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def contains(self, online_id: str) -> bool:
+        "Whether a fresh entry exists, without touching the hit/miss counters."
+        row = self.store.conn.execute(
+            "SELECT 1 FROM account_ids WHERE online_id = ? AND resolved_at > ?",
+            (online_id, time.time() - self.ttl),
+        ).fetchone()
+        return row is not None
+
+    def set(self, online_id: str, account_id: str) -> None:
+        self.store.conn.execute(
+            "INSERT OR REPLACE INTO account_ids (online_id, account_id, resolved_at) VALUES (?, ?, ?)",
+            (online_id, account_id, time.time()),
+        )
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    product_id: str
+    region: str
+    sku_id: str
+    name: str | None
+    image_url: str | None
+    first_seen: float
+    last_seen: float
+
+
+class ProductCatalog:
+    "Everything learned from chihiro container responses, keyed by (product_id, region)."
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS products (
+            product_id TEXT NOT NULL,
+            region TEXT NOT NULL,
+            sku_id TEXT NOT NULL,
+            name TEXT,
+            image_url TEXT,
+            first_seen REAL NOT NULL,
+            last_seen REAL NOT NULL,
+            PRIMARY KEY (product_id, region)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS products_region_product ON products (region, product_id)",
+        "CREATE INDEX IF NOT EXISTS products_sku ON products (sku_id)",
+        "CREATE INDEX IF NOT EXISTS products_name ON products (name COLLATE NOCASE)",
+    )
+    COLUMNS = "product_id, region, sku_id, name, image_url, first_seen, last_seen"
+
+    def __init__(self, store: SQLiteStore) -> None:
+        self.store = store
+        for statement in self.SCHEMA:
+            store.conn.execute(statement)
+
+    def record(
+        self,
+        product_id: str,
+        region: str,
+        sku_id: str,
+        name: str | None = None,
+        image_url: str | None = None,
+    ) -> None:
+        now = time.time()
+        self.store.conn.execute(
+            """
+            INSERT INTO products (product_id, region, sku_id, name, image_url, first_seen, last_seen)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (product_id, region) DO UPDATE SET
+                sku_id = excluded.sku_id,
+                name = COALESCE(excluded.name, products.name),
+                image_url = COALESCE(excluded.image_url, products.image_url),
+                last_seen = excluded.last_seen
+            """,
+            (product_id, region, sku_id, name, image_url, now, now),
+        )
+
+    def touch(self, product_id: str, region: str) -> None:
+        self.store.conn.execute(
+            "UPDATE products SET last_seen = ? WHERE product_id = ? AND region = ?",
+            (time.time(), product_id, region),
+        )
+
+    def get(self, product_id: str, region: str) -> CatalogEntry | None:
+        row = self.store.conn.execute(
+            f"SELECT {self.COLUMNS} FROM products WHERE product_id = ? AND region = ?",
+            (product_id, region),
+        ).fetchone()
+        return CatalogEntry(*row) if row else None
+
+    def delete(self, product_id: str, region: str) -> None:
+        self.store.conn.execute("DELETE FROM products WHERE product_id = ? AND region = ?", (product_id, region))
+
+    def search(self, prefix: str, region: str | None = None, limit: int = 25) -> list[CatalogEntry]:
+        "Most recently seen entries whose product ID starts with `prefix` (range scan on the primary key)."
+        low = prefix.strip().upper()
+        high = low + "\uffff"
+        if region:
+            rows = self.store.conn.execute(
+                f"SELECT {self.COLUMNS} FROM products WHERE region = ? AND product_id >= ? AND product_id < ? "
+                "ORDER BY last_seen DESC LIMIT ?",
+                (region, low, high, limit),
+            ).fetchall()
+        else:
+            rows = self.store.conn.execute(
+                f"SELECT {self.COLUMNS} FROM products WHERE product_id >= ? AND product_id < ? "
+                "ORDER BY last_seen DESC LIMIT ?",
+                (low, high, limit),
+            ).fetchall()
+        return [CatalogEntry(*row) for row in rows]
+
+    def __len__(self) -> int:
+        return self.store.conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+
+class SkuCacheStore:
+    "Write-through disk copy of the (region, product_id) -> SKU cache so restarts begin warm."
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS sku_cache (
+            region TEXT NOT NULL,
+            product_id TEXT NOT NULL,
+            sku_id TEXT NOT NULL,
+            avatar_url TEXT,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (region, product_id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS sku_cache_expires ON sku_cache (expires_at)",
+    )
+    PRUNE_EVERY = 256
+
+    def __init__(self, store: SQLiteStore, maxsize: int, stale_ttl: float = 0.0) -> None:
+        self.store = store
+        self.maxsize = maxsize
+        self.stale_ttl = stale_ttl
+        self._writes = 0
+        for statement in self.SCHEMA:
+            store.conn.execute(statement)
+
+    def load(self) -> list[tuple[str, str, str, str | None, float]]:
+        "Rows still within their stale window, newest first, as (region, product_id, sku_id, avatar_url, seconds_left)."
+        self.prune()
+        now = time.time()
+        rows = self.store.conn.execute(
+            "SELECT region, product_id, sku_id, avatar_url, expires_at FROM sku_cache "
+            "WHERE expires_at > ? ORDER BY expires_at DESC LIMIT ?",
+            (now - self.stale_ttl, self.maxsize),
+        ).fetchall()
+        return [(region, product_id, sku_id, avatar_url, expires_at - now) for region, product_id, sku_id, avatar_url, expires_at in rows]
+
+    def set(self, region: str, product_id: str, sku_id: str, avatar_url: str | None, ttl: float) -> None:
+        self.store.conn.execute(
+            "INSERT OR REPLACE INTO sku_cache (region, product_id, sku_id, avatar_url, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (region, product_id, sku_id, avatar_url, time.time() + ttl),
+        )
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def delete(self, region: str, product_id: str) -> None:
+        self.store.conn.execute("DELETE FROM sku_cache WHERE region = ? AND product_id = ?", (region, product_id))
+
+    def prune(self) -> None:
+        "Drop rows past their stale window, then the soonest-to-expire rows beyond maxsize."
+        self.store.conn.execute("DELETE FROM sku_cache WHERE expires_at <= ?", (time.time() - self.stale_ttl,))
+        self.store.conn.execute(
+            "DELETE FROM sku_cache WHERE rowid IN "
+            "(SELECT rowid FROM sku_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.maxsize,),
+        )
+
+    def __len__(self) -> int:
+        return self.store.conn.execute("SELECT COUNT(*) FROM sku_cache").fetchone()[0]
+
+
+class RequestHistory:
+    "Per-(region, product_id) request scores that halve every `half_life` seconds, so recent demand outranks old favourites."
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS request_history (
+            region TEXT NOT NULL,
+            product_id TEXT NOT NULL,
+            score REAL NOT NULL,
+            last_requested REAL NOT NULL,
+            PRIMARY KEY (region, product_id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS request_history_last ON request_history (last_requested)",
+    )
+    # Entries idle for this many half-lives have decayed to noise and are dropped.
+    HORIZON_HALF_LIVES = 8
+
+    def __init__(self, store: SQLiteStore, half_life: float) -> None:
+        self.store = store
+        self.half_life = half_life
+        # Requests counted since the last flush, as (decayed score, last requested); kept off disk on the hot path.
+        self._pending: dict[tuple[str, str], tuple[float, float]] = {}
+        self._pending_lock = threading.Lock()
+        for statement in self.SCHEMA:
+            store.conn.execute(statement)
+
+    def _decayed(self, score: float, last_requested: float, now: float) -> float:
+        return score * 0.5 ** ((now - last_requested) / self.half_life)
+
+    def record(self, region: str, product_id: str) -> None:
+        "Count one request in memory; flush() folds the counts into the table."
+        now = time.time()
+        key = (region, product_id)
+        with self._pending_lock:
+            pending = self._pending.get(key)
+            self._pending[key] = (1.0 + (self._decayed(*pending, now) if pending else 0.0), now)
+
+    def flush(self) -> None:
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for (region, product_id), (score, last_requested) in pending.items():
+            row = self.store.conn.execute(
+                "SELECT score, last_requested FROM request_history WHERE region = ? AND product_id = ?",
+                (region, product_id),
+            ).fetchone()
+            if row:
+                score += self._decayed(*row, last_requested)
+            self.store.conn.execute(
+                "INSERT OR REPLACE INTO request_history (region, product_id, score, last_requested) VALUES (?, ?, ?, ?)",
+                (region, product_id, score, last_requested),
+            )
+
+    def top(self, limit: int) -> list[tuple[str, str]]:
+        "The `limit` most requested (region, product_id) pairs by decayed score, after flushing pending counts."
+        self.flush()
+        now = time.time()
+        cutoff = now - self.half_life * self.HORIZON_HALF_LIVES
+        self.store.conn.execute("DELETE FROM request_history WHERE last_requested < ?", (cutoff,))
+        rows = self.store.conn.execute(
+            "SELECT region, product_id, score, last_requested FROM request_history"
+        ).fetchall()
+        rows.sort(key=lambda row: self._decayed(row[2], row[3], now), reverse=True)
+        return [(region, product_id) for region, product_id, _, _ in rows[:limit]]
@@ -6,12 +6,15 @@ from math import ceil
 import traceback
 import asyncio
 from collections.abc import Awaitable, Callable, Sequence
+from contextvars import ContextVar
 import aiohttp
 import discord
 from dotenv import load_dotenv
 from discord.ext import commands
 from pathlib import Path
 
+from api.metrics import DISCORD_REST_SECONDS, discord_trace_config, start_metrics_server
+
 
 def _detect_env_source() -> tuple[bool, Path | None]:
     args = sys.argv[1:]
@@ -83,6 +86,13 @@ os.environ["TOKEN"] = token_config
 os.environ["GUILD_ID"] = guild_config_raw
 os.environ["PREFIX"] = prefix_config
 
+# Optional tuning keys forwarded from .config to the cogs when present.
+OPTIONAL_CONFIG_KEYS = ("PSN_CONCURRENCY", "PSN_CACHE_DB", "PSN_STALE_SECS", "METRICS_PORT")
+for optional_key in OPTIONAL_CONFIG_KEYS:
+    optional_value = config_values.get(optional_key, "").strip()
+    if optional_value:
+        os.environ[optional_key] = optional_value
+
 guild_config_parts = [part.strip() for part in guild_config_raw.split(",") if part.strip()]
 if not guild_config_parts:
     raise SystemExit("GUILD_ID must define at least one Discord server ID.")
@@ -111,6 +121,8 @@ activity = discord.Activity(
 COGS = ["misc", "psn"]
 AUTO_SYNC_DEBUG_GUILD = True
 SYNC_TIMEOUT_SECS = 20
+# How long shutdown waits for cleanup tasks scheduled by cog_unload.
+SHUTDOWN_GRACE_SECS = 5
 APPLICATION_ID: str | None = None
 _banner_printed = False
 _cogs_loaded = False
@@ -122,6 +134,9 @@ _force_sync = False
 _bot_token: str = ""
 
 
+# HTTP status of the most recent Discord REST response in the current task.
+_discord_status: ContextVar[int | None] = ContextVar("discord_status", default=None)
+
 bot = commands.Bot(
     command_prefix=commands.when_mentioned_or(PREFIX),
     activity=activity,
@@ -132,6 +147,47 @@ if AUTO_SYNC_DEBUG_GUILD:
     bot.debug_guilds = list(GUILD_IDS)
 
 
+def _instrument_discord_http(http) -> None:
+    # Every REST call the library makes goes through HTTPClient.request; route.path is the
+    # templated path (e.g. /channels/{channel_id}/messages), so labels stay low-cardinality.
+    # request() hands back parsed JSON only, so a trace hook on pycord's own session captures
+    # the HTTP status of the last response each call received (after pycord's own retries).
+    original_request = http.request
+    status_trace = aiohttp.TraceConfig()
+
+    async def on_request_end(_session, _context, params: aiohttp.TraceRequestEndParams) -> None:
+        _discord_status.set(params.response.status)
+
+    status_trace.on_request_end.append(on_request_end)
+    status_trace.freeze()
+
+    async def request(route, **kwargs):
+        # The session is created in static_login (and again after a reconnect), so attach lazily.
+        # Private API: relies on py-cord 2.8.0 (pinned in requirements.txt) keeping its session in
+        # HTTPClient.__session, and on aiohttp 3.x (checked on 3.14) keeping ClientSession._trace_configs
+        # as a list read per request. Re-check both when bumping either; the status label falls back to "error".
+        session = getattr(http, "_HTTPClient__session", None)
+        if isinstance(session, aiohttp.ClientSession) and status_trace not in session._trace_configs:
+            session._trace_configs.append(status_trace)
+        _discord_status.set(None)
+        started = time.perf_counter()
+        try:
+            return await original_request(route, **kwargs)
+        finally:
+            status = _discord_status.get()
+            DISCORD_REST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=route.method,
+                route=route.path,
+                status="error" if status is None else str(status),
+            )
+
+    http.request = request
+
+
+_instrument_discord_http(bot.http)
+
+
 async def load_extensions() -> None:
     global _cogs_loaded
     if _cogs_loaded:
@@ -173,7 +229,9 @@ async def ensure_guild_membership(token: str, guild_ids: Sequence[int]) -> list[
     accessible: list[int] = []
     missing: list[int] = []
 
-    async with aiohttp.ClientSession(headers=headers, timeout=timeout) as session:
+    async with aiohttp.ClientSession(
+        headers=headers, timeout=timeout, trace_configs=[discord_trace_config()]
+    ) as session:
         async with session.get("https://discord.com/api/v10/oauth2/applications/@me") as resp:
             if resp.status != 200:
                 text = await resp.text()
@@ -238,7 +296,9 @@ async def fetch_command_sets(token: str, guild_id: int) -> tuple[set[str], set[s
                 return await resp.json()
         raise RuntimeError(f"Exceeded retries for GET {url}")
 
-    async with aiohttp.ClientSession(headers=headers, timeout=timeout) as session:
+    async with aiohttp.ClientSession(
+        headers=headers, timeout=timeout, trace_configs=[discord_trace_config()]
+    ) as session:
         global_json = await _get_json(
             session, f"https://discord.com/api/v10/applications/{APPLICATION_ID}/commands"
         )
@@ -565,11 +625,31 @@ async def main(args: argparse.Namespace) -> None:
                 "will skip sync unless forced."
             )
 
+    metrics_runner = None
+    metrics_port = os.getenv("METRICS_PORT", "").strip()
+    if metrics_port:
+        try:
+            metrics_runner = await start_metrics_server(int(metrics_port))
+        except (ValueError, OSError) as exc:
+            print(f"[warn] Metrics endpoint disabled: {exc}")
+
     print("Starting bot...")
     try:
         await bot.start(token)
     finally:
+        # Bot.close() does not unload extensions on this pycord version, so cog_unload would never run.
+        for extension in tuple(bot.extensions):
+            try:
+                bot.unload_extension(extension)
+            except Exception:
+                print(f"[cog] ERROR unloading {extension}:\n{traceback.format_exc()}")
         await bot.close()
+        # cog_unload can only schedule async cleanup (HTTP sessions, SQLite); let it finish before asyncio.run() cancels it.
+        pending = asyncio.all_tasks() - {asyncio.current_task()}
+        if pending:
+            await asyncio.wait(pending, timeout=SHUTDOWN_GRACE_SECS)
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
 
 
 def parse_args() -> argparse.Namespace:
@@ -72,12 +72,15 @@ def build_help_embed(prefix: str) -> discord.Embed:
         value=(
             f"> `/psn check <region> <product_id (SKU)> [up to 3 more IDs]`\n"
             f"> `{prefix}psn check <region> <product_id (SKU)> [more IDs…]`\n\n"
+            f"> `/psn sweep <product_id (SKU)> [regions] [first]` *(all regions by default)*\n"
+            f"> `{prefix}psn sweep <product_id (SKU)> [region…] [--first]`\n\n"
+            f"> `/psn catalog <prefix> [region]` · `{prefix}psn catalog <prefix> [region]` *(offline, no PSN calls)*\n\n"
             f"> `/psn add <region> <product_id (SKU)> [up to 3 more IDs]` *(PDC required)*\n"
             f"> `{prefix}psn add <region> <product_id (SKU)> [more IDs…] --pdc YOUR_COOKIE` *(required if the bot wasn't started with `--env`)*\n\n"
             f"> `/psn remove <region> <product_id (SKU)> [up to 3 more IDs]` *(PDC required)*\n"
             f"> `{prefix}psn remove <region> <product_id (SKU)> [more IDs…] --pdc YOUR_COOKIE` *(required if the bot wasn't started with `--env`)*\n\n"
-            f"> `/psn account <username> <npsso_token>` *(NPSSO required for lookups)*\n"
-            f"> `{prefix}psn account <username> --npsso YOUR_TOKEN`\n"
+            f"> `/psn account [usernames] [npsso_token] [file]` *(NPSSO required unless every username is cached)*\n"
+            f"> `{prefix}psn account <username> [username...] --npsso YOUR_TOKEN`\n"
         ),
         inline=False,
     )
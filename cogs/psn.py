@@ -1,12 +1,17 @@
 import os
+import io
+import asyncio
+from dataclasses import replace
+from pathlib import Path
 from typing import Iterable
 
 import re
 import discord
 from discord import Option
-from discord.ext import commands
+from discord.ext import commands, tasks
 from api.common import APIError
-from api.psn import PSN, PSNRequest
+from api.concurrency import map_bounded
+from api.psn import PSN, PSNOperation, PSNRequest, SKU_STALE_SECS
 from psnawp_api.core.psnawp_exceptions import PSNAWPNotFoundError as PSNAWPNotFound
 
 valid_regions = [
@@ -37,9 +42,21 @@ invalid_region = discord.Embed(
     color=0xe74c3c)
 
 token_desc = "PDC cookie (required)"
-id_desc = "ID from psprices product_id command"
+id_desc = "ID from psprices product_id command (a full SKU also works)"
 region_desc = "Region code (e.g. 'en-US' or 'US')"
-npsso_desc = "NPSSO token from https://www.playstation.com (required for account lookups)"
+npsso_desc = "NPSSO token from https://www.playstation.com (needed unless the username was looked up before)"
+UPSTREAM_FAILURE_MESSAGE = "Could not reach the PlayStation Store. Try again shortly."
+DEFAULT_CONCURRENCY = 8
+MAX_BULK_ACCOUNTS = 100
+MAX_USERNAME_FILE_BYTES = 64 * 1024
+SWEEP_FIELD_LIMIT = 1024
+SWEEP_MAX_SKU_FIELDS = 20
+CATALOG_RESULT_LIMIT = 25
+# Background warm-up of the most requested products (runs once at startup, then on this interval).
+WARM_INTERVAL_MINUTES = 30
+WARM_TOP_N = 50
+WARM_RATE_PER_SEC = 1.0
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent / "data" / "psn_cache.sqlite3"
 NPSSO_HELP_LINK = "🔐 Need a token? [Get NPSSO](https://ca.account.sony.com/api/v1/ssocookie) after logging into [PlayStation](https://www.playstation.com/)."
 
 COUNTRY_OVERRIDES = {
@@ -129,6 +146,22 @@ def _parse_allowed_guilds(raw: str | None) -> set[int]:
     return guild_ids
 
 
+def _parse_positive_int(raw: str | None, default: int) -> int:
+    try:
+        value = int((raw or "").strip())
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+def _parse_non_negative_int(raw: str | None, default: int) -> int:
+    try:
+        value = int((raw or "").strip())
+    except ValueError:
+        return default
+    return value if value >= 0 else default
+
+
 def mask_value(value: str, visible: int = 4) -> str:
     if not value:
         return ""
@@ -161,7 +194,7 @@ def looks_like_product_id(value: str) -> bool:
     if ("-" not in v) or ("_" not in v):
         return False
     # Common container/SKU formats seen in practice (loose on the tail)
-    if re.match(r"^[A-Z]{2}\d{4}-[A-Z0-9_]+_[0-9]{2}-[A-Z0-9_]+$", v):
+    if re.match(r"^[A-Z]{2}\d{4}-[A-Z0-9_]+_[0-9]{2}-[A-Z0-9_]+(-[A-Z0-9]{4})?$", v):
         return True
     if re.match(r"^[A-Z]{2}\d{4}-[A-Z0-9_]+$", v):
         return True
@@ -204,19 +237,71 @@ def normalize_region_input(value: str) -> str:
     raise APIError("Invalid region code or alias")
 
 
+async def autocomplete_product_ids(ctx: discord.AutocompleteContext) -> list[discord.OptionChoice]:
+    cog = ctx.cog
+    if cog is None:
+        return []
+    try:
+        region = normalize_region_input(ctx.options.get("region") or "")
+    except APIError:
+        region = None
+    choices: dict[str, discord.OptionChoice] = {}
+    for entry in cog.api.catalog.search(ctx.value or "", region=region, limit=CATALOG_RESULT_LIMIT):
+        if entry.product_id not in choices:
+            label = f"{entry.product_id} — {entry.name}" if entry.name else entry.product_id
+            choices[entry.product_id] = discord.OptionChoice(name=label[:100], value=entry.product_id)
+    return list(choices.values())
+
+
 class PSNCog(commands.Cog):
 
     def __init__(
         self,
-        secret: str,
         bot: commands.Bot,
         default_pdc: str | None = None,
         allowed_guild_ids: Iterable[int] | None = None,
         env_path: str | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        cache_path: str | None = None,
+        stale_window: int = SKU_STALE_SECS,
     ) -> None:
         self.bot = bot
-        self.api = PSN(secret, default_pdc, env_path)
+        self.concurrency = max(1, concurrency)
+        self.api = PSN(default_pdc, env_path, cache_path, stale_window=stale_window)
+        self.api.open_session()
         self.allowed_guild_ids: set[int] = set(allowed_guild_ids or [])
+        self._background_tasks: set[asyncio.Task] = set()
+        self.cache_warmer.start()
+
+    def cog_unload(self) -> None:
+        self.cache_warmer.cancel()
+        # Pycord calls this synchronously when the extension is unloaded: on a manual reload, or
+        # from bot.py's shutdown path, which unloads extensions itself because Bot.close() does not.
+        # Schedule the session shutdown on the running loop (bot.loop is the loop captured when the
+        # Bot was built, not the one asyncio.run() drives); bot.py waits for it before exiting.
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self.api.close())
+            return
+        task = loop.create_task(self.api.close())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    @tasks.loop(minutes=WARM_INTERVAL_MINUTES)
+    async def cache_warmer(self) -> None:
+        # An exception escaping a tasks.loop stops it for good, so failures are logged and the schedule carries on.
+        try:
+            warmed = await self.api.warm_sku_cache(WARM_TOP_N, WARM_RATE_PER_SEC)
+        except Exception as exc:
+            print(f"[psn] Cache warmer run failed: {exc!r}")
+            return
+        if warmed:
+            print(f"[psn] Cache warmer pre-resolved {warmed} popular product(s).")
+
+    @cache_warmer.before_loop
+    async def _before_cache_warmer(self) -> None:
+        await self.bot.wait_until_ready()
 
     @staticmethod
     def _auth_error_embed(
@@ -530,22 +615,37 @@ class PSNCog(commands.Cog):
         successes: list[tuple[str, str]] = []
         failures: list[tuple[str, str]] = []
 
-        for pid in ids:
-            request = PSNRequest(
+        requests = [
+            PSNRequest(
                 region=region,
                 product_id=pid,
                 requested_by=actor,
             )
+            for pid in ids
+        ]
+        # Checks only preview the avatar, so a recently expired SKU is good enough while it refreshes.
+        outcomes = await map_bounded(
+            lambda request: self.api.check_avatar(request, allow_stale=True),
+            requests,
+            self.concurrency,
+        )
 
-            try:
-                avatar_url = await self.api.check_avatar(request)
-                successes.append((pid, avatar_url))
-            except APIError as e:
-                message = e.message if getattr(e, "message", None) else str(e)
-                hints = getattr(e, "hints", {}) or {}
+        for request, outcome in zip(requests, outcomes):
+            if not isinstance(outcome, Exception):
+                self.api.record_request(request)
+
+        for pid, outcome in zip(ids, outcomes):
+            if isinstance(outcome, APIError):
+                message = outcome.message if getattr(outcome, "message", None) else str(outcome)
+                hints = getattr(outcome, "hints", {}) or {}
                 if hints.get("npsso"):
                     message = f"{message}\n{NPSSO_HELP_LINK}"
                 failures.append((pid, message))
+            elif isinstance(outcome, Exception):
+                print(f"[psn] Check for {pid} failed: {outcome!r}")
+                failures.append((pid, UPSTREAM_FAILURE_MESSAGE))
+            else:
+                successes.append((pid, outcome))
 
         is_app_context = self._is_app_context(ctx)
 
@@ -608,6 +708,150 @@ class PSNCog(commands.Cog):
             for idx, chunk in enumerate(chunks):
                 await ctx.send(content=mention, embeds=chunk, silent=True)
 
+    async def _handle_sweep(
+        self,
+        ctx,
+        *,
+        product_id: str,
+        regions: list[str] | None = None,
+        stop_at_first: bool = False,
+    ) -> None:
+        if not await self._ensure_allowed_guild(ctx):
+            return
+
+        mention = self._mention(ctx)
+        product_id = (product_id or "").strip().upper()
+        if not product_id:
+            embed = discord.Embed(
+                title="ℹ️ Missing Product ID",
+                description="Provide the product ID to sweep across regions.",
+                color=0xf1c40f,
+            )
+            await self._send_embed(ctx, embed, content=mention)
+            return
+
+        if regions:
+            try:
+                targets = list(dict.fromkeys(normalize_region_input(region) for region in regions))
+            except APIError:
+                await self._send_embed(ctx, invalid_region, content=mention)
+                return
+        else:
+            targets = list(valid_regions)
+
+        progress_embed = discord.Embed(
+            title="🌍 Sweeping Regions...",
+            description=f"⏳ Checking **{product_id}** in {len(targets)} region(s)…",
+            color=0xffa726,
+        )
+        is_app_context = self._is_app_context(ctx)
+        if is_app_context:
+            await ctx.respond(content=mention, embed=progress_embed)
+            progress_message = None
+        else:
+            progress_message = await ctx.send(content=mention, embed=progress_embed, silent=True)
+
+        try:
+            matrix = await self.api.sweep_regions(
+                product_id,
+                targets,
+                self.concurrency,
+                requested_by=self._actor_label(ctx),
+                stop_at_first=stop_at_first,
+            )
+        except APIError as e:
+            embed_result = discord.Embed(title="❌ Sweep Failed", description=f"🚫 {e}", color=0xe74c3c)
+        else:
+            embed_result = self._sweep_embed(product_id, matrix, len(targets))
+
+        if is_app_context:
+            await ctx.edit(embed=embed_result)
+        elif progress_message is not None:
+            await progress_message.edit(embed=embed_result)
+        else:
+            await self._send_embed(ctx, embed_result, content=mention)
+
+    @staticmethod
+    def _sweep_embed(product_id: str, matrix: dict[str, str | Exception], requested: int) -> discord.Embed:
+        found: dict[str, list[str]] = {}
+        missing: list[str] = []
+        errors: list[str] = []
+        for region, outcome in matrix.items():
+            if isinstance(outcome, APIError) and outcome.code == "not_found":
+                missing.append(region)
+            elif isinstance(outcome, Exception):
+                if not isinstance(outcome, APIError):
+                    print(f"[psn] Sweep of {product_id} in {region} failed: {outcome!r}")
+                errors.append(region)
+            else:
+                found.setdefault(outcome, []).append(region)
+
+        def region_list(items: list[str]) -> str:
+            text = ", ".join(f"`{region}`" for region in items)
+            if len(text) <= SWEEP_FIELD_LIMIT:
+                return text
+            cut = text.rfind(", ", 0, SWEEP_FIELD_LIMIT - 20)
+            return f"{text[:cut]} … (+{len(items) - text[:cut].count(', ') - 1} more)"
+
+        available = sum(len(items) for items in found.values())
+        if available:
+            title, color = "✅ Region Sweep Complete", 0x27ae60
+        elif errors:
+            title, color = "⚠️ Region Sweep Incomplete", 0xf1c40f
+        else:
+            title, color = "❌ Not Available Anywhere", 0xe74c3c
+
+        description = f"🌍 **{product_id}** is available in **{available}/{len(matrix)}** region(s)."
+        if len(matrix) < requested:
+            description += f"\n⏩ Stopped after checking {len(matrix)} of {requested} regions."
+        embed = discord.Embed(title=title, description=description, color=color)
+        for sku, items in list(found.items())[:SWEEP_MAX_SKU_FIELDS]:
+            embed.add_field(name=f"🏷️ {sku}", value=region_list(items), inline=False)
+        if missing:
+            embed.add_field(name=f"❌ Not found ({len(missing)})", value=region_list(missing), inline=False)
+        if errors:
+            embed.add_field(name=f"⚠️ Lookup failed ({len(errors)})", value=region_list(errors), inline=False)
+        embed.set_footer(text="💡 Use /psn check with one of the regions above to preview the avatar.")
+        return embed
+
+    async def _handle_catalog(self, ctx, *, prefix: str, region: str | None = None) -> None:
+        if not await self._ensure_allowed_guild(ctx):
+            return
+
+        mention = self._mention(ctx)
+        if region:
+            try:
+                region = normalize_region_input(region)
+            except APIError:
+                await self._send_embed(ctx, invalid_region, content=mention)
+                return
+
+        entries = self.api.catalog.search(prefix or "", region=region, limit=CATALOG_RESULT_LIMIT)
+        if not entries:
+            embed = discord.Embed(
+                title="📭 Nothing Cataloged",
+                description=(
+                    f"No known products start with `{(prefix or '').upper() or '…'}`"
+                    + (f" in `{region}`." if region else ".")
+                    + "\nProducts are added after they are checked once."
+                ),
+                color=0xf1c40f,
+            )
+            await self._send_embed(ctx, embed, content=mention)
+            return
+
+        lines = []
+        for entry in entries:
+            name = f" — {entry.name}" if entry.name else ""
+            lines.append(f"• `{entry.product_id}` (`{entry.region}`){name}\n  SKU `{entry.sku_id}` · seen <t:{int(entry.last_seen)}:R>")
+        embed = discord.Embed(
+            title=f"📚 Catalog Matches ({len(entries)})",
+            description="\n".join(lines)[:4000],
+            color=0x3498db,
+        )
+        embed.set_footer(text=f"🗂️ {len(self.api.catalog)} product/region pairs cataloged locally.")
+        await self._send_embed(ctx, embed, content=mention)
+
     async def _handle_add_or_remove(
         self,
         ctx,
@@ -621,7 +865,8 @@ class PSNCog(commands.Cog):
         if not await self._ensure_allowed_guild(ctx):
             return
 
-        cleaned_ids = [pid.strip() for pid in product_ids if pid.strip()]
+        # The same avatar pasted twice (in any case) is one cart operation.
+        cleaned_ids = list(dict.fromkeys(pid.strip().upper() for pid in product_ids if pid.strip()))
         if not cleaned_ids:
             embed = discord.Embed(
                 title="ℹ️ Missing Product IDs",
@@ -685,45 +930,78 @@ class PSNCog(commands.Cog):
         successes: list[str] = []
         failures: list[tuple[str, str]] = []
 
-        for pid in cleaned_ids:
-            request = PSNRequest(
-                region=region,
-                product_id=pid,
-                pdccws_p=cookie_arg,
-                requested_by=actor,
+        async def report_auth_error(errors: dict[str, APIError]) -> bool:
+            auth_error = next(
+                (errors[pid] for pid in cleaned_ids if pid in errors and getattr(errors[pid], "code", None) == "auth"),
+                None,
             )
+            if auth_error is None:
+                return False
+            message = auth_error.message if getattr(auth_error, "message", None) else str(auth_error)
+            hints = getattr(auth_error, "hints", {}) or {}
+            embed_error = self._auth_error_embed(
+                message,
+                cookie_override,
+                hints.get("cookie", True),
+                hints.get("npsso", True),
+            )
+            if is_app_context:
+                await ctx.edit(embed=embed_error)
+            elif progress_message is not None:
+                await progress_message.edit(embed=embed_error)
+            else:
+                await self._send_embed(ctx, embed_error, content=mention)
+            return True
+
+        base_request = PSNRequest(
+            region=region,
+            product_id=cleaned_ids[0],
+            pdccws_p=cookie_arg,
+            requested_by=actor,
+        )
+        # Stage one: resolve every SKU concurrently; failures are collected without holding up the rest.
+        requests = [replace(base_request, product_id=pid) for pid in cleaned_ids]
+        resolutions = await map_bounded(self.api.resolve_sku, requests, self.concurrency)
+        resolved: dict[str, str] = {}
+        errors: dict[str, APIError] = {}
+        for request, outcome in zip(requests, resolutions):
+            if isinstance(outcome, APIError):
+                errors[request.product_id] = outcome
+            elif isinstance(outcome, Exception):
+                print(f"[psn] Resolving {request.product_id} failed: {outcome!r}")
+                errors[request.product_id] = APIError(UPSTREAM_FAILURE_MESSAGE)
+            else:
+                resolved[request.product_id] = outcome
+                self.api.record_request(request)
+        if await report_auth_error(errors):
+            return
 
+        # Stage two: one cart, so mutations go out as ordered batches rather than in parallel.
+        if resolved:
+            cart_operation = PSNOperation.ADD_TO_CART if operation == "add" else PSNOperation.REMOVE_FROM_CART
             try:
-                if operation == "add":
-                    await self.api.add_to_cart(request)
-                else:
-                    await self.api.remove_from_cart(request)
+                sku_outcomes = await self.api.mutate_cart(base_request, cart_operation, list(resolved.values()))
+            except APIError as e:
+                sku_outcomes = {sku_id: e for sku_id in resolved.values()}
+            for pid, sku_id in resolved.items():
+                outcome = sku_outcomes.get(sku_id)
+                if outcome is not None:
+                    errors[pid] = outcome
+            if await report_auth_error(errors):
+                return
+
+        for pid in cleaned_ids:
+            e = errors.get(pid)
+            if e is None:
                 successes.append(pid)
                 results.append((pid, True, None))
-            except APIError as e:
-                message = e.message if getattr(e, "message", None) else str(e)
-                if getattr(e, "code", None) == "auth":
-                    hints = getattr(e, "hints", {}) or {}
-                    need_cookie = hints.get("cookie", True)
-                    need_npsso = hints.get("npsso", True)
-                    embed_error = self._auth_error_embed(
-                        message,
-                        cookie_override,
-                        need_cookie,
-                        need_npsso,
-                    )
-                    if is_app_context:
-                        await ctx.edit(embed=embed_error)
-                    elif progress_message is not None:
-                        await progress_message.edit(embed=embed_error)
-                    else:
-                        await self._send_embed(ctx, embed_error, content=mention)
-                    return
-                hints = getattr(e, "hints", {}) or {}
-                if hints.get("npsso"):
-                    message = f"{message}\n{NPSSO_HELP_LINK}"
-                failures.append((pid, message))
-                results.append((pid, False, message))
+                continue
+            message = e.message if getattr(e, "message", None) else str(e)
+            hints = getattr(e, "hints", {}) or {}
+            if hints.get("npsso"):
+                message = f"{message}\n{NPSSO_HELP_LINK}"
+            failures.append((pid, message))
+            results.append((pid, False, message))
 
         if successes and not failures:
             title = "✅ Added Successfully!" if operation == "add" else "✅ Removed Successfully!"
@@ -775,11 +1053,40 @@ class PSNCog(commands.Cog):
         else:
             await self._send_embed(ctx, embed_result, content=mention)
 
-    async def _handle_account(self, ctx, username: str, npsso: str | None) -> None:
+    async def _handle_account(self, ctx, usernames: list[str], npsso: str | None) -> None:
         if not await self._ensure_allowed_guild(ctx):
             return
 
         mention = self._mention(ctx)
+        if not usernames:
+            embed = discord.Embed(
+                title="ℹ️ Missing Username",
+                description="Provide at least one PSN username to look up.",
+                color=0xf1c40f,
+            )
+            await self._send_embed(ctx, embed, content=mention)
+            return
+        # Case-insensitive dedupe that keeps the first spelling and the caller's order.
+        seen: set[str] = set()
+        unique: list[str] = []
+        for name in usernames:
+            if name.lower() not in seen:
+                seen.add(name.lower())
+                unique.append(name)
+        usernames = unique
+        if len(usernames) > MAX_BULK_ACCOUNTS:
+            embed = discord.Embed(
+                title="⚠️ Too Many Usernames",
+                description=f"Look up at most {MAX_BULK_ACCOUNTS} usernames per command.",
+                color=0xf39c12,
+            )
+            await self._send_embed(ctx, embed, content=mention)
+            return
+        if len(usernames) > 1:
+            await self._handle_bulk_account(ctx, usernames, npsso)
+            return
+
+        username = usernames[0]
         progress_embed = discord.Embed(
             title="🔍 Searching User...",
             description=f"⏳ Looking up **{username}** on PlayStation Network...",
@@ -823,6 +1130,86 @@ class PSNCog(commands.Cog):
         else:
             await self._send_embed(ctx, embed_success, content=mention)
 
+    async def _handle_bulk_account(self, ctx, usernames: list[str], npsso: str | None) -> None:
+        mention = self._mention(ctx)
+        progress_embed = discord.Embed(
+            title="🔍 Searching Users...",
+            description=f"⏳ Looking up **{len(usernames)}** usernames on PlayStation Network...",
+            color=0xf39c12,
+        )
+
+        is_app_context = self._is_app_context(ctx)
+        if is_app_context:
+            await ctx.respond(content=mention, embed=progress_embed)
+            progress_message = None
+        else:
+            progress_message = await ctx.send(content=mention, embed=progress_embed, silent=True)
+
+        outcomes = await self.api.obtain_account_ids(usernames, npsso, self.concurrency)
+        rows: list[tuple[str, str, str]] = []
+        for username, outcome in zip(usernames, outcomes):
+            if isinstance(outcome, APIError):
+                rows.append((username, "", str(outcome)))
+            elif isinstance(outcome, Exception):
+                print(f"[psn] Account lookup for {username} failed: {outcome!r}")
+                rows.append((username, "", UPSTREAM_FAILURE_MESSAGE))
+            else:
+                rows.append((username, outcome, ""))
+
+        resolved = sum(1 for _, account_id, _ in rows if account_id)
+        width = max(len("Username"), *(len(username) for username, _, _ in rows))
+        table_lines = [f"{'Username'.ljust(width)}  Account ID"]
+        for username, account_id, error in rows:
+            table_lines.append(f"{username.ljust(width)}  {account_id or '❌ ' + error}")
+        table = "\n".join(table_lines)
+
+        if resolved == len(rows):
+            title, color = "✅ Account IDs Retrieved", 0x27ae60
+        elif resolved:
+            title, color = "⚠️ Some Lookups Failed", 0xf1c40f
+        else:
+            title, color = "❌ Account Lookups Failed", 0xe74c3c
+
+        attachment: discord.File | None = None
+        description = f"```\n{table}\n```"
+        if len(description) > 4000:
+            csv_lines = ["username,account_id,error"]
+            csv_lines.extend(f"{username},{account_id},{error.replace(',', ';')}" for username, account_id, error in rows)
+            attachment = discord.File(io.BytesIO("\n".join(csv_lines).encode("utf-8")), filename="psn_accounts.csv")
+            description = "📎 Results are attached as `psn_accounts.csv`."
+
+        embed_result = discord.Embed(title=title, description=description, color=color)
+        footer = f"Resolved {resolved}/{len(rows)} usernames."
+        if resolved < len(rows) and not npsso:
+            footer += " Provide an NPSSO token to resolve uncached usernames."
+        embed_result.set_footer(text=footer)
+
+        if is_app_context:
+            await ctx.edit(embed=embed_result)
+            if attachment is not None:
+                await ctx.followup.send(content=mention, file=attachment)
+        elif progress_message is not None:
+            await progress_message.edit(embed=embed_result)
+            if attachment is not None:
+                await ctx.send(content=mention, file=attachment, silent=True)
+
+    @staticmethod
+    def _split_usernames(*chunks: str | None) -> list[str]:
+        names: list[str] = []
+        for chunk in chunks:
+            if chunk:
+                names.extend(part for part in re.split(r"[\s,;]+", chunk) if part)
+        return names
+
+    @staticmethod
+    async def _read_username_attachment(attachment: discord.Attachment | None) -> str | None:
+        if attachment is None:
+            return None
+        if attachment.size > MAX_USERNAME_FILE_BYTES:
+            raise APIError(f"Username file is too large (max {MAX_USERNAME_FILE_BYTES // 1024} KB).")
+        data = await attachment.read()
+        return data.decode("utf-8", errors="ignore")
+
     psn_group = discord.SlashCommandGroup(
         "psn", description="PlayStation Store avatar utilities."
     )
@@ -832,7 +1219,7 @@ class PSNCog(commands.Cog):
         self,
         ctx: discord.ApplicationContext,
         region: Option(str, description=region_desc),  # type: ignore
-        product_id: Option(str, description=id_desc),  # type: ignore
+        product_id: Option(str, description=id_desc, autocomplete=autocomplete_product_ids),  # type: ignore
         product_id2: Option(str, description="Additional product ID (optional)", default=None) = None,  # type: ignore[arg-type]
         product_id3: Option(str, description="Additional product ID (optional)", default=None) = None,  # type: ignore[arg-type]
         product_id4: Option(str, description="Additional product ID (optional)", default=None) = None,  # type: ignore[arg-type]
@@ -850,7 +1237,7 @@ class PSNCog(commands.Cog):
         self,
         ctx: discord.ApplicationContext,
         region: Option(str, description=region_desc),  # type: ignore
-        product_id: Option(str, description=id_desc),  # type: ignore
+        product_id: Option(str, description=id_desc, autocomplete=autocomplete_product_ids),  # type: ignore
         pdc: Option(str, description=token_desc, required=True),  # type: ignore[arg-type]
         product_id2: Option(str, description="Additional product ID (optional)", default=None) = None,  # type: ignore[arg-type]
         product_id3: Option(str, description="Additional product ID (optional)", default=None) = None,  # type: ignore[arg-type]
@@ -884,7 +1271,7 @@ class PSNCog(commands.Cog):
         self,
         ctx: discord.ApplicationContext,
         region: Option(str, description=region_desc),  # type: ignore
-        product_id: Option(str, description=id_desc),  # type: ignore
+        product_id: Option(str, description=id_desc, autocomplete=autocomplete_product_ids),  # type: ignore
         pdc: Option(str, description=token_desc, required=True),  # type: ignore[arg-type]
         product_id2: Option(str, description="Additional product ID (optional)", default=None) = None,  # type: ignore[arg-type]
         product_id3: Option(str, description="Additional product ID (optional)", default=None) = None,  # type: ignore[arg-type]
@@ -913,14 +1300,41 @@ class PSNCog(commands.Cog):
             operation="remove",
         )
 
+    @psn_group.command(name="sweep", description="🌍 Checks which regions carry an avatar.")
+    async def psn_slash_sweep(
+        self,
+        ctx: discord.ApplicationContext,
+        product_id: Option(str, description=id_desc, autocomplete=autocomplete_product_ids),  # type: ignore
+        regions: Option(str, description="Regions to check, separated by spaces or commas (default: all).", required=False, default=None) = None,  # type: ignore[arg-type]
+        first: Option(bool, description="Stop at the first region that carries it, trying the likeliest regions first.", required=False, default=False) = False,  # type: ignore[arg-type]
+    ) -> None:
+        selected = [part for part in re.split(r"[\s,;]+", regions or "") if part]
+        await self._handle_sweep(ctx, product_id=product_id, regions=selected, stop_at_first=first)
+
+    @psn_group.command(name="catalog", description="📚 Searches products the bot has already seen.")
+    async def psn_slash_catalog(
+        self,
+        ctx: discord.ApplicationContext,
+        prefix: Option(str, description="Start of the product ID.", autocomplete=autocomplete_product_ids),  # type: ignore
+        region: Option(str, description=region_desc, required=False, default=None) = None,  # type: ignore[arg-type]
+    ) -> None:
+        await self._handle_catalog(ctx, prefix=prefix, region=region)
+
     @psn_group.command(name="account", description="🆔 Gets the account ID from a PSN username.")
     async def psn_slash_account(
         self,
         ctx: discord.ApplicationContext,
-        username: Option(str, description="PSN username to resolve."),  # type: ignore
-        npsso: Option(str, description=npsso_desc, required=True),  # type: ignore[arg-type]
+        username: Option(str, description="PSN username(s) to resolve, separated by spaces or commas.", required=False, default=None) = None,  # type: ignore[arg-type]
+        npsso: Option(str, description=npsso_desc, required=False, default=None) = None,  # type: ignore[arg-type]
+        file: Option(discord.Attachment, description="Text file with one username per line.", required=False, default=None) = None,  # type: ignore[arg-type]
     ) -> None:
-        await self._handle_account(ctx, username, npsso)
+        try:
+            usernames = self._split_usernames(username, await self._read_username_attachment(file))
+        except APIError as e:
+            embed = discord.Embed(title="⚠️ Invalid File", description=f"🚫 {e}", color=0xf39c12)
+            await self._send_embed(ctx, embed, content=self._mention(ctx))
+            return
+        await self._handle_account(ctx, usernames, npsso)
 
     @commands.group(name="psn", invoke_without_command=True)
     async def psn_prefix(self, ctx: commands.Context) -> None:
@@ -932,7 +1346,7 @@ class PSNCog(commands.Cog):
             embed = discord.Embed(
                 title="🎮 PSN Commands",
                 description=(
-                    "Use `/psn check`, `/psn add`, `/psn remove`, or `/psn account`.\n"
+                    "Use `/psn check`, `/psn sweep`, `/psn catalog`, `/psn add`, `/psn remove`, or `/psn account`.\n"
                     "Prefix usage: `$psn <subcommand>` (your original message is auto-deleted)."
                 ),
                 color=0x3498db,
@@ -984,18 +1398,59 @@ class PSNCog(commands.Cog):
             operation="remove",
         )
 
+    @psn_prefix.command(name="sweep")
+    async def psn_prefix_sweep(self, ctx: commands.Context, *, entries: str = "") -> None:
+        await self._delete_prefix_message(ctx)
+        tokens = [part for part in re.split(r"[\s,;]+", entries or "") if part]
+        stop_at_first = any(token.lower() == "--first" for token in tokens)
+        tokens = [token for token in tokens if token.lower() != "--first"]
+        if not tokens:
+            usage = f"{ctx.prefix or ''}{ctx.invoked_with} <product_id> [region...] [--first]"
+            embed = discord.Embed(
+                title="ℹ️ Missing Arguments",
+                description=(
+                    "Provide a product ID, optionally followed by the regions to check (default: all). "
+                    "Add `--first` to stop at the first region that carries it.\n"
+                    f"Example: `{usage}`"
+                ),
+                color=0xf1c40f,
+            )
+            await self._send_embed(ctx, embed, content=self._mention(ctx))
+            return
+        await self._handle_sweep(ctx, product_id=tokens[0], regions=tokens[1:], stop_at_first=stop_at_first)
+
+    @psn_prefix.command(name="catalog")
+    async def psn_prefix_catalog(self, ctx: commands.Context, prefix: str = "", region: str | None = None) -> None:
+        await self._delete_prefix_message(ctx)
+        await self._handle_catalog(ctx, prefix=prefix, region=region)
+
     @psn_prefix.command(name="account")
     async def psn_prefix_account(self, ctx: commands.Context, *, entries: str = "") -> None:
+        attachments = list(getattr(ctx.message, "attachments", None) or [])
+        try:
+            file_payload = await self._read_username_attachment(attachments[0] if attachments else None)
+        except APIError as e:
+            file_payload = None
+            file_error = str(e)
+        else:
+            file_error = None
         await self._delete_prefix_message(ctx)
         mention = self._mention(ctx)
 
+        if file_error:
+            embed = discord.Embed(title="⚠️ Invalid File", description=f"🚫 {file_error}", color=0xf39c12)
+            await self._send_embed(ctx, embed, content=mention)
+            return
+
         payload = (entries or "").strip()
+        if file_payload:
+            payload = f"{file_payload}\n{payload}".strip()
         if not payload:
-            usage = f"{ctx.prefix or ''}{ctx.invoked_with} account <username> --npsso YOUR_TOKEN"
+            usage = f"{ctx.prefix or ''}{ctx.invoked_with} account <username> [username...] --npsso YOUR_TOKEN"
             embed = discord.Embed(
                 title="ℹ️ Missing Arguments",
                 description=(
-                    "Provide a PSN username followed by your NPSSO token.\n"
+                    "Provide one or more PSN usernames (or attach a text file) followed by your NPSSO token.\n"
                     f"Example: `{usage}`"
                 ),
                 color=0xf1c40f,
@@ -1005,15 +1460,15 @@ class PSNCog(commands.Cog):
 
         tokens: list[str] = []
         for line in payload.replace("\r", "\n").splitlines():
-            tokens.extend(part.strip() for part in line.split())
+            tokens.extend(part.strip() for part in re.split(r"[\s,;]+", line))
 
         tokens = [t for t in tokens if t]
         if not tokens:
-            usage = f"{ctx.prefix or ''}{ctx.invoked_with} account <username> --npsso YOUR_TOKEN"
+            usage = f"{ctx.prefix or ''}{ctx.invoked_with} account <username> [username...] --npsso YOUR_TOKEN"
             embed = discord.Embed(
                 title="ℹ️ Missing Arguments",
                 description=(
-                    "Provide a PSN username followed by your NPSSO token.\n"
+                    "Provide one or more PSN usernames (or attach a text file) followed by your NPSSO token.\n"
                     f"Example: `{usage}`"
                 ),
                 color=0xf1c40f,
@@ -1021,18 +1476,22 @@ class PSNCog(commands.Cog):
             await self._send_embed(ctx, embed, content=mention)
             return
 
-        username = tokens[0]
-        if username.startswith("--"):
+        if tokens[0].startswith("--"):
             embed = discord.Embed(
                 title="ℹ️ Missing Username",
-                description="The first argument must be the PSN username before any options.",
+                description="The PSN username(s) must come before any options.",
                 color=0xf1c40f,
             )
             await self._send_embed(ctx, embed, content=mention)
             return
 
+        usernames: list[str] = []
+        idx = 0
+        while idx < len(tokens) and not tokens[idx].startswith("--"):
+            usernames.append(tokens[idx])
+            idx += 1
+
         npsso_value: str | None = None
-        idx = 1
         while idx < len(tokens):
             token = tokens[idx]
             lowered = token.lower()
@@ -1055,14 +1514,16 @@ class PSNCog(commands.Cog):
             else:
                 embed = discord.Embed(
                     title="⚠️ Invalid Argument",
-                    description="Only the username and `--npsso` option are supported for this command.",
+                    description="Only usernames and the `--npsso` option are supported for this command.",
                     color=0xf39c12,
                 )
                 await self._send_embed(ctx, embed, content=mention)
                 return
             idx += 1
 
-        if not npsso_value or not npsso_value.strip():
+        if (not npsso_value or not npsso_value.strip()) and not all(
+            self.api.has_cached_account_id(username) for username in usernames
+        ):
             embed = discord.Embed(
                 title="ℹ️ Missing NPSSO Token",
                 description=(
@@ -1074,7 +1535,33 @@ class PSNCog(commands.Cog):
             await self._send_embed(ctx, embed, content=mention)
             return
 
-        await self._handle_account(ctx, username, npsso_value.strip())
+        await self._handle_account(ctx, usernames, npsso_value.strip() if npsso_value else None)
+
+    @psn_prefix.command(name="reload")
+    @commands.is_owner()
+    async def psn_prefix_reload(self, ctx: commands.Context) -> None:
+        await self._delete_prefix_message(ctx)
+        if not await self._ensure_allowed_guild(ctx):
+            return
+        if self.api.env_path is None:
+            embed = discord.Embed(
+                title="ℹ️ No .env File",
+                description="The bot was started without `--env`, so there are no stored credentials to reload.",
+                color=0xf1c40f,
+            )
+        elif self.api.reload_credentials():
+            embed = discord.Embed(
+                title="🔄 Credentials Reloaded",
+                description=f"Re-read `{self.api.env_path.name}`. New cart commands will use the updated `PDC` value.",
+                color=0x27ae60,
+            )
+        else:
+            embed = discord.Embed(
+                title="⚠️ .env File Missing",
+                description=f"Could not find `{self.api.env_path}`. Restore the file and try again.",
+                color=0xe67e22,
+            )
+        await self._send_embed(ctx, embed, content=self._mention(ctx))
 
     async def _ensure_allowed_guild(self, ctx) -> bool:
         if not self.allowed_guild_ids:
@@ -1102,10 +1589,12 @@ def setup(bot: commands.Bot) -> None:
     env_path = os.getenv("BOT_ENV_PATH") if use_env else None
     default_pdc = os.getenv("PDC") if use_env else None
     cog = PSNCog(
-        os.getenv("NPSSO"),
         bot,
         default_pdc,
         _parse_allowed_guilds(os.getenv("GUILD_ID")),
         env_path=env_path,
+        concurrency=_parse_positive_int(os.getenv("PSN_CONCURRENCY"), DEFAULT_CONCURRENCY),
+        cache_path=os.getenv("PSN_CACHE_DB") or str(DEFAULT_CACHE_PATH),
+        stale_window=_parse_non_negative_int(os.getenv("PSN_STALE_SECS"), SKU_STALE_SECS),
     )
     bot.add_cog(cog)